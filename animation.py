@@ -0,0 +1,80 @@
+# Sprite animations driven by the game time
+from parameters import *
+
+
+class Animation:
+    # Row of the animation table, the frame sets themselves are loaded by the assets
+    def __init__(self, frames_number, frame_time, loop=True):
+        self.frames_number = frames_number
+        self.frame_time = frame_time    # ms
+        self.loop = loop                # False: the animation is played once
+        self.duration = frames_number * frame_time
+        return
+
+
+# ANIMATION TABLE
+PLAYER_STAND_ANIMATION = Animation(PLAYER_STANDING_FRAMES_NUMBER, PLAYER_STAND_ANIMATION_FRAME_TIME)
+PLAYER_WALK_ANIMATION = Animation(PLAYER_WALK_FRAMES_NUMBER, PLAYER_WALK_ANIMATION_FRAME_TIME)
+PLAYER_JUMP_UP_ANIMATION = Animation(PLAYER_JUMP_UP_FRAMES_NUMBER, PLAYER_JUMP_UP_ANIMATION_FRAME_TIME)
+PLAYER_JUMP_DOWN_ANIMATION = Animation(PLAYER_JUMP_DOWN_FRAMES_NUMBER, PLAYER_JUMP_DOWN_ANIMATION_FRAME_TIME)
+ENEMY_ANIMATION = Animation(ENEMY_FRAMES_NUMBER, ENEMY_ANIMATION_FRAME_TIME)
+ENEMY_HIT_ANIMATION = Animation(1, ENEMY_ANIMATION_FRAME_TIME, False)
+ENEMY_FIRE_ANIMATION = Animation(ENEMY_FIRE_FRAMES_NUMBER, ENEMY_FIRE_ANIMATION_FRAME_TIME)
+FIREBALL_ANIMATION = Animation(FIREBALL_FRAMES_NUMBER, FIREBALL_ANIMATION_FRAME_TIME)
+COIN_ANIMATION = Animation(COIN_FRAMES_NUMBER, COIN_ANIMATION_FRAME_TIME)
+SPLASH_ANIMATION = Animation(SPLASH_FRAMES_NUMBER, SPLASH_ANIMATION_FRAME_TIME, False)
+EXPLOSION_ANIMATION = Animation(EXPLOSION_FRAMES_NUMBER, EXPLOSION_ANIMATION_FRAME_TIME, False)
+MISCBAR_COIN_ANIMATION = Animation(MISCBAR_COIN_FRAMES_NUMBER, MISCBAR_COIN_ANIMATION_FRAME_TIME)
+
+
+class AnimationClock:
+    # Game time of the animations, ticked once per simulation step.
+    # Looping animations started at time 0 are in phase with the clock: their frame is the same for every entity,
+    # so it is computed once per tick for each animation of the table.
+    def __init__(self):
+        self.time = 0
+        self.frames = {}
+        return
+
+    def tick(self, time):
+        self.time = time
+        self.frames.clear()
+        return
+
+    def frame(self, animation):
+        frame = self.frames.get(animation)
+        if frame is None:
+            frame = int(self.time // animation.frame_time) % animation.frames_number
+            self.frames[animation] = frame
+        return frame
+
+
+animation_clock = AnimationClock()
+
+
+class Animator:
+    # Frame index of the animation played by an entity, the entity picks the frame in its own frame set
+    __slots__ = ("animation", "start")
+
+    def __init__(self, animation, start=0):
+        self.play(animation, start)
+        return
+
+    def play(self, animation, start=0):
+        # The animation starts from its first frame at the start time, 0 keeps a looping animation in phase with the clock
+        self.animation = animation
+        self.start = start
+        return
+
+    def frame(self):
+        animation = self.animation
+        if not self.start and animation.loop:
+            return animation_clock.frame(animation)
+        frame = int((animation_clock.time - self.start) // animation.frame_time)
+        if animation.loop:
+            return frame % animation.frames_number
+        return min(frame, animation.frames_number - 1)
+
+    def finished(self):
+        # A one-shot animation is finished after its last frame
+        return not self.animation.loop and animation_clock.time - self.start >= self.animation.duration
@@ -1,203 +1,177 @@
 # Assets classes
+import sys
 import pygame
 import math
 from parameters import *
+from resources import frame_cache, text_cache, blit_visible
+from frame_context import frame_context
+from animation import *
 
 
 class World:
-    def __init__(self, world_number, image_source, set_colorkey=False, colorkey=(0, 0, 0)):
-        WORLD_WIDTH = WORLD_WIDTH_DIRECTORY[world_number-1]
-        WORLD_HEIGHT = WORLD_HEIGHT_DIRECTORY[world_number-1]
-        WORLD_INITIAL_X = WORLD_INITIAL_X_DIRECTORY[world_number-1]
-        WORLD_INITIAL_Y = WORLD_INITIAL_Y_DIRECTORY[world_number-1]
-        self.image = pygame.image.load(image_source)
-        self.image = pygame.transform.scale(self.image, (WORLD_WIDTH, WORLD_HEIGHT))
-        if set_colorkey:
-            self.image.set_colorkey(colorkey)
-        self.rect = self.image.get_rect()
-        self.rect.left = WORLD_INITIAL_X
-        self.rect.top = WORLD_INITIAL_Y
+    def __init__(self, world_number, chunks):
+        # The tiles are streamed in chunks, which are already scaled to the world size (see WorldChunks)
+        self.chunks = chunks
+        self.rect = pygame.Rect(0, 0, chunks.width, chunks.height)
         self.kill = False
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
+    def draw(self, screen, camera):
+        self.chunks.stream(camera.left, camera.right)
+        self.chunks.draw(screen, self.rect.move(-camera.x, -camera.y))
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+
+class WorldBackground:
+    # Parallax layers of the world (WORLD_BACKGROUND_LAYERS_DIRECTORY), drawn from the farthest to the nearest
+    def __init__(self, world_number, images):
+        # The layers are placed for the initial camera position of the world
+        camera_x = -WORLD_INITIAL_X_DIRECTORY[world_number-1]
+        camera_y = -WORLD_INITIAL_Y_DIRECTORY[world_number-1]
+        self.layers = []
+        for image, (image_source, depth_factor, y) in zip(images, WORLD_BACKGROUND_LAYERS_DIRECTORY[world_number-1]):
+            self.layers.append(BackgroundLayer(image, depth_factor, y, (camera_x, camera_y)))
+        # The background covers the whole world
+        self.rect = pygame.Rect(0, 0, WORLD_WIDTH_DIRECTORY[world_number-1], WORLD_HEIGHT_DIRECTORY[world_number-1])
+        self.kill = False
+        return
+
+    def draw(self, screen, camera):
+        for layer in self.layers:
+            layer.draw(screen, camera)
         return
 
 
-class WorldBackground:
-    def __init__(self, world_number, image_source, set_colorkey=False, colorkey=(0, 0, 0)):
-        self.DEPTH_FACTOR = WORLD_DEPTH_FACTOR_DIRECTORY[world_number-1]
-        self.image = pygame.image.load(image_source)
-        self.image = pygame.transform.scale(self.image, (1920, 1080))
-        if set_colorkey:
-            self.image.set_colorkey(colorkey)
+class BackgroundLayer:
+    # Native size image repeated horizontally, so its memory does not depend on the world width
+    def __init__(self, image, depth_factor, y, origin):
+        # The layer is drawn at y on the screen when the camera is at its origin
+        self.DEPTH_FACTOR = depth_factor
+        self.image = image
         self.rect = self.image.get_rect()
-        self.rect.left = 0
-        self.rect.top = -300
-        self.kill = False
+        self.rect.top = y
+        self.origin_x, self.origin_y = origin
         return
 
-    def update(self, dx, dy):
+    def draw(self, screen, camera):
         # DEPTH_FACTOR = 0 for static background
         # 0 < DEPTH_FACTOR < 1 for slower movement of background in order to give the sense of depth
         # DEPTH_FACTOR = 1 the background is fixed with the platforms and is moving with them
-        self.rect.x -= int(self.DEPTH_FACTOR * dx)
-        self.rect.y -= int(self.DEPTH_FACTOR * dy)
-        return
-
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+        tile = self.rect.move(-int(self.DEPTH_FACTOR * (camera.x - self.origin_x)), -int(self.DEPTH_FACTOR * (camera.y - self.origin_y)))
+        # Wrap-around, only the visible slices of the visible repetitions are blitted
+        tile.x %= tile.width
+        if tile.x > 0:
+            tile.x -= tile.width
+        while tile.x < screen.get_width():
+            blit_visible(screen, self.image, tile)
+            tile.x += tile.width
         return
 
 
 class Platform:
     def __init__(self, world_number, x, y, w, h):
-        WORLD_INITIAL_X = WORLD_INITIAL_X_DIRECTORY[world_number-1]
-        WORLD_INITIAL_Y = WORLD_INITIAL_Y_DIRECTORY[world_number - 1]
         self.image = pygame.Surface((w, h))
         self.image.fill(GREEN)
         self.rect = pygame.Rect(x, y, w, h)
-        self.rect.x = WORLD_INITIAL_X + x
-        self.rect.y = WORLD_INITIAL_Y + y
         self.show_rect = False
         self.kill = False
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
-        return
-
-    def draw(self, screen):
+    def draw(self, screen, camera):
         if self.show_rect:
-            screen.blit(self.image, self.rect)
+            screen.blit(self.image, self.rect.move(-camera.x, -camera.y))
         return
 
 
 class Door:
     def __init__(self, world_number, x, y, w, h):
-        WORLD_INITIAL_X = WORLD_INITIAL_X_DIRECTORY[world_number - 1]
-        WORLD_INITIAL_Y = WORLD_INITIAL_Y_DIRECTORY[world_number - 1]
         self.image = pygame.Surface((w, h))
         self.image.fill(GREEN)
         self.rect = pygame.Rect(x, y, w, h)
-        self.rect.x = WORLD_INITIAL_X + x
-        self.rect.y = WORLD_INITIAL_Y + y
         self.show_rect = False
         self.kill = False
         self.opened = False
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
-        return
-
     def check_if_door_is_open(self):
         # Check whether player opens the door
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP]:
+        if frame_context.keys[pygame.K_UP]:
             self.opened = True
         return
 
-    def draw(self, screen):
+    def draw(self, screen, camera):
         if self.show_rect:
-            screen.blit(self.image, self.rect)
+            screen.blit(self.image, self.rect.move(-camera.x, -camera.y))
         return
 
 
 class Player:
     def __init__(self, world_number):
-        PLAYER_INITIAL_X = WORLD_PLAYER_INITIAL_X_DIRECTORY[world_number-1]
-        PLAYER_INITIAL_Y = WORLD_PLAYER_INITIAL_Y_DIRECTORY[world_number-1]
-        WORLD_HEIGHT = WORLD_HEIGHT_DIRECTORY[world_number-1]
+        # The initial position is given on the screen, at the initial camera position of the world
+        PLAYER_INITIAL_X = WORLD_PLAYER_INITIAL_X_DIRECTORY[world_number-1] - WORLD_INITIAL_X_DIRECTORY[world_number-1]
+        PLAYER_INITIAL_Y = WORLD_PLAYER_INITIAL_Y_DIRECTORY[world_number-1] - WORLD_INITIAL_Y_DIRECTORY[world_number-1]
         self.walking = False
         self.jumping = False
         self.jumping_up = True
-        self.current_frame = 0
-        self.last_update = 0
+        self.animator = Animator(PLAYER_STAND_ANIMATION)
         self.load_images()
         self.image = self.standing_frames_r[0]
         self.rect = self.image.get_rect()
         self.rect.x = PLAYER_INITIAL_X
         self.rect.y = PLAYER_INITIAL_Y
-        self.abs_pos_x = PLAYER_INITIAL_X
-        self.abs_pos_y = WORLD_HEIGHT - (HEIGHT - PLAYER_INITIAL_Y)
+        self.last_rect = self.rect.copy()
+        self.pos_x = self.rect.x    # Subpixel position, the rect is rounded from it
+        self.pos_y = self.rect.y
         self.vel_x = 0
         self.vel_y = 0
         self.acc_x = 0
         self.acc_y = 0
         self.direction_right = True
         self.coins_collected = 0
-        self.time_last_update = pygame.time.get_ticks()
         self.life = PLAYER_INITIAL_LIFE
         self.can_jump = False
         self.kill = False
-        self.pause_time = 0
         self.lives = 0
         self.world = 0
         return
 
     def load_images(self):
+        size = (PLAYER_WIDTH, PLAYER_HEIGHT)
         # Standing frames
-        self.standing_frames_r = []
-        self.standing_frames_l = []
-        for frame in range(PLAYER_STANDING_FRAMES_NUMBER):
-            self.standing_frames_r.append(pygame.image.load(f"assets/player/standing/{frame}.png"))
-            self.standing_frames_r[frame] = pygame.transform.scale(self.standing_frames_r[frame], (PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.standing_frames_l.append(pygame.transform.flip(self.standing_frames_r[frame], True, False))
+        self.standing_frames_r = frame_cache.load_frames("assets/player/standing", PLAYER_STANDING_FRAMES_NUMBER, size)
+        self.standing_frames_l = frame_cache.load_frames("assets/player/standing", PLAYER_STANDING_FRAMES_NUMBER, size, True)
 
         # Walking frames
-        self.walk_frames_r = []
-        self.walk_frames_l = []
-        for frame in range(PLAYER_WALK_FRAMES_NUMBER):
-            self.walk_frames_r.append(pygame.image.load(f"assets/player/moving/{frame}.png"))
-            self.walk_frames_r[frame] = pygame.transform.scale(self.walk_frames_r[frame], (PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.walk_frames_l.append(pygame.transform.flip(self.walk_frames_r[frame], True, False))
+        self.walk_frames_r = frame_cache.load_frames("assets/player/moving", PLAYER_WALK_FRAMES_NUMBER, size)
+        self.walk_frames_l = frame_cache.load_frames("assets/player/moving", PLAYER_WALK_FRAMES_NUMBER, size, True)
 
         # Jumping frames up
-        self.jump_frames_up_r = []
-        self.jump_frames_up_l = []
-        for frame in range(PLAYER_JUMP_UP_FRAMES_NUMBER):
-            self.jump_frames_up_r.append(pygame.image.load(f"assets/player/jumping_up/{frame}.png"))
-            self.jump_frames_up_r[frame] = pygame.transform.scale(self.jump_frames_up_r[frame], (PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.jump_frames_up_l.append(pygame.transform.flip(self.jump_frames_up_r[frame], True, False))
+        self.jump_frames_up_r = frame_cache.load_frames("assets/player/jumping_up", PLAYER_JUMP_UP_FRAMES_NUMBER, size)
+        self.jump_frames_up_l = frame_cache.load_frames("assets/player/jumping_up", PLAYER_JUMP_UP_FRAMES_NUMBER, size, True)
 
-        # Jumping frames up
-        self.jump_frames_down_r = []
-        self.jump_frames_down_l = []
-        for frame in range(PLAYER_JUMP_DOWN_FRAMES_NUMBER):
-            self.jump_frames_down_r.append(pygame.image.load(f"assets/player/jumping_down/{frame}.png"))
-            self.jump_frames_down_r[frame] = pygame.transform.scale(self.jump_frames_down_r[frame], (PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.jump_frames_down_l.append(pygame.transform.flip(self.jump_frames_down_r[frame], True, False))
-        return
+        # Jumping frames down
+        self.jump_frames_down_r = frame_cache.load_frames("assets/player/jumping_down", PLAYER_JUMP_DOWN_FRAMES_NUMBER, size)
+        self.jump_frames_down_l = frame_cache.load_frames("assets/player/jumping_down", PLAYER_JUMP_DOWN_FRAMES_NUMBER, size, True)
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
-        self.animate()
-        self.control_and_physics()
+        # Frame set of each animation
+        self.frames_r = {PLAYER_STAND_ANIMATION: self.standing_frames_r, PLAYER_WALK_ANIMATION: self.walk_frames_r,
+                         PLAYER_JUMP_UP_ANIMATION: self.jump_frames_up_r, PLAYER_JUMP_DOWN_ANIMATION: self.jump_frames_down_r}
+        self.frames_l = {PLAYER_STAND_ANIMATION: self.standing_frames_l, PLAYER_WALK_ANIMATION: self.walk_frames_l,
+                         PLAYER_JUMP_UP_ANIMATION: self.jump_frames_up_l, PLAYER_JUMP_DOWN_ANIMATION: self.jump_frames_down_l}
         return
 
-    def pass_pause_time(self, pause_time):
-        self.pause_time += pause_time
+    def update(self, dt):
+        self.last_rect = self.rect.copy()
+        self.animate()
+        self.control_and_physics(dt)
         return
 
-    def control_and_physics(self):
-        # Physics for movement
-        current_time = pygame.time.get_ticks()
-        current_time -= self.pause_time
-        dt = (current_time - self.time_last_update) * 0.001  # converted from ms to s
-        self.time_last_update = current_time
+    def control_and_physics(self, dt):
+        # Physics for movement, dt is the simulation step
+        dt *= 0.001  # converted from ms to s
         T = 0
         F = 0
-        keys = pygame.key.get_pressed()
+        keys = frame_context.keys
         if self.vel_x > 0:
             if keys[pygame.K_RIGHT]:
                 T = -FRICTION_COEFFICIENT * MASS * GRAVITY
@@ -246,10 +220,16 @@ class Player:
             self.vel_x = 0
         if abs(self.vel_y) <= UMIN:
             self.vel_y = 0.1
-        self.rect.x += int(self.vel_x * dt)
-        self.rect.y += int(self.vel_y * dt)
-        self.abs_pos_x += int(self.vel_x * dt)
-        self.abs_pos_y += int(self.vel_y * dt)
+        # The moves of a step are often a fraction of a pixel, they add up in the subpixel position so that the speeds
+        # do not depend on SIMULATION_RATE. The collisions move the rect, its position is taken again when they did.
+        if self.rect.x != round(self.pos_x):
+            self.pos_x = self.rect.x
+        if self.rect.y != round(self.pos_y):
+            self.pos_y = self.rect.y
+        self.pos_x += self.vel_x * dt
+        self.pos_y += self.vel_y * dt
+        self.rect.x = round(self.pos_x)
+        self.rect.y = round(self.pos_y)
         return
 
     def jump(self):
@@ -258,114 +238,46 @@ class Player:
             self.vel_y = JUMP_INITIAL_VELOCITY
 
     def animate(self):
-        now = pygame.time.get_ticks()
-        keys = pygame.key.get_pressed()
+        keys = frame_context.keys
         if self.vel_x > 0 or keys[pygame.K_RIGHT]:
             self.direction_right = True
         if self.vel_x < 0 or keys[pygame.K_LEFT]:
             self.direction_right = False
-
-        if abs(self.vel_x) >= UMIN:
-            if not self.walking:
-                self.current_frame = 0
-            self.walking = True
-        else:
-            if self.walking:
-                self.current_frame = 0
-            self.walking = False
-
-        if self.vel_y != 0:
-            self.jumping = True
-        else:
-            self.jumping = False
-
+        self.walking = abs(self.vel_x) >= UMIN
+        self.jumping = self.vel_y != 0
         if self.vel_y < 0:
-            if not self.jumping_up:
-                self.current_frame = 0
             self.jumping_up = True
         if self.vel_y > 0:
-            if self.jumping_up:
-                self.current_frame = 0
             self.jumping_up = False
 
-        if not self.jumping and not self.walking:
-            if self.current_frame >= PLAYER_STANDING_FRAMES_NUMBER:     # for debugging
-                self.current_frame = 0
-
-            if now - self.last_update > PLAYER_STAND_ANIMATION_FRAME_TIME:
-                self.last_update = now
-                if self.current_frame != PLAYER_STANDING_FRAMES_NUMBER - 1:
-                    self.current_frame += 1
-                else:
-                    self.current_frame = 0
-            if self.direction_right:
-                self.image = self.standing_frames_r[self.current_frame]
-            else:
-                self.image = self.standing_frames_l[self.current_frame]
-        elif self.walking and not self.jumping:
-            if self.current_frame >= PLAYER_WALK_FRAMES_NUMBER:  # for debugging
-                self.current_frame = 0
-
-            if now - self.last_update > PLAYER_WALK_ANIMATION_FRAME_TIME:
-                self.last_update = now
-                if self.current_frame != PLAYER_WALK_FRAMES_NUMBER - 1:
-                    self.current_frame += 1
-                else:
-                    self.current_frame = 0
-            if self.direction_right:
-                self.image = self.walk_frames_r[self.current_frame]
-            else:
-                self.image = self.walk_frames_l[self.current_frame]
+        if not self.jumping:
+            animation = PLAYER_WALK_ANIMATION if self.walking else PLAYER_STAND_ANIMATION
         else:
-            if self.jumping_up:
-                if self.current_frame >= PLAYER_JUMP_UP_FRAMES_NUMBER:  # for debugging
-                    self.current_frame = 0
-
-                if now - self.last_update > PLAYER_JUMP_UP_ANIMATION_FRAME_TIME:
-                    self.last_update = now
-                    if self.current_frame != PLAYER_JUMP_UP_FRAMES_NUMBER - 1:
-                        self.current_frame += 1
-                    else:
-                        self.current_frame = 0
-                if self.direction_right:
-                    self.image = self.jump_frames_up_r[self.current_frame]
-                else:
-                    self.image = self.jump_frames_up_l[self.current_frame]
-            else:
-                if self.current_frame >= PLAYER_JUMP_DOWN_FRAMES_NUMBER:  # for debugging
-                    self.current_frame = 0
-
-                if now - self.last_update > PLAYER_JUMP_DOWN_ANIMATION_FRAME_TIME:
-                    self.last_update = now
-                    if self.current_frame != PLAYER_JUMP_DOWN_FRAMES_NUMBER - 1:
-                        self.current_frame += 1
-                    else:
-                        self.current_frame = 0
-                if self.direction_right:
-                    self.image = self.jump_frames_down_r[self.current_frame]
-                else:
-                    self.image = self.jump_frames_down_l[self.current_frame]
+            animation = PLAYER_JUMP_UP_ANIMATION if self.jumping_up else PLAYER_JUMP_DOWN_ANIMATION
+        if animation is not self.animator.animation:
+            # A new animation starts from its first frame
+            self.animator.play(animation, frame_context.time)
+        if self.direction_right:
+            self.image = self.frames_r[animation][self.animator.frame()]
+        else:
+            self.image = self.frames_l[animation][self.animator.frame()]
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
-        return
+    def draw(self, screen, camera, alpha):
+        rect = interpolate(self.last_rect, self.rect, alpha).move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class Enemy:
     def __init__(self, world_number, x, y):
-        WORLD_INITIAL_X = WORLD_INITIAL_X_DIRECTORY[world_number-1]
-        WORLD_INITIAL_Y = WORLD_INITIAL_Y_DIRECTORY[world_number-1]
-        self.current_frame = 0
-        self.last_update = 0
-        self.last_fire_time = pygame.time.get_ticks()
-        self.pause_time = 0
+        self.animator = Animator(ENEMY_ANIMATION)
+        self.last_fire_time = frame_context.time
         self.load_images()
         self.image = self.frames_l[0]
         self.rect = self.image.get_rect()
-        self.rect.x = WORLD_INITIAL_X + x
-        self.rect.y = WORLD_INITIAL_Y + y
-        self.time_last_update = pygame.time.get_ticks()
+        self.rect.x = x
+        self.rect.y = y
         self.life = ENEMY_INITIAL_LIFE
         self.player_x = 0
         self.player_y = 0
@@ -377,30 +289,20 @@ class Enemy:
 
     def load_images(self):
         # Enemy frames
-        self.frames_r = []
-        self.frames_l = []
-        for frame in range(ENEMY_FRAMES_NUMBER):
-            self.frames_l.append(pygame.image.load(f"assets/enemy/ghost/{frame}.png"))
-            self.frames_l[frame] = pygame.transform.scale(self.frames_l[frame], (ENEMY_WIDTH, ENEMY_HEIGHT))
-            self.frames_r.append(pygame.transform.flip(self.frames_l[frame], True, False))
-        # Adding extra frame for enemy hit
-        self.frames_l.append(pygame.image.load(f"assets/enemy/ghost/hit.png"))
-        self.frames_l[ENEMY_FRAMES_NUMBER] = pygame.transform.scale(self.frames_l[ENEMY_FRAMES_NUMBER], (ENEMY_WIDTH, ENEMY_HEIGHT))
-        self.frames_r.append(pygame.transform.flip(self.frames_l[ENEMY_FRAMES_NUMBER], True, False))
-        return
-
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
+        size = (ENEMY_WIDTH, ENEMY_HEIGHT)
+        # Extra frame for enemy hit, after the animation frames
+        self.frames_l = frame_cache.load_frames_with_image("assets/enemy/ghost", ENEMY_FRAMES_NUMBER, size, "assets/enemy/ghost/hit.png")
+        self.frames_r = frame_cache.load_frames_with_image("assets/enemy/ghost", ENEMY_FRAMES_NUMBER, size, "assets/enemy/ghost/hit.png", True)
+        return
+
+    def update(self, dt):
         self.animate()
         return
 
     def damage(self):
-        now = pygame.time.get_ticks()
         self.life -= ENEMY_DAMAGE_PER_FIREBALL
-        self.last_update = now
         self.is_hit = True
-        self.current_frame = ENEMY_FRAMES_NUMBER
+        self.animator.play(ENEMY_HIT_ANIMATION, frame_context.time)
 
     def animate(self):
         # Checks direction
@@ -410,27 +312,24 @@ class Enemy:
         else:
             if self.player_x > self.rect.x + ENEMY_WIDTH:
                 self.direction_right = True
-        # Frame
-        now = pygame.time.get_ticks()
-        if not self.is_hit:
-            if now - self.last_update > ENEMY_ANIMATION_FRAME_TIME:
-                self.last_update = now
-                if self.direction_right:
-                    self.image = self.frames_r[self.current_frame]
-                else:
-                    self.image = self.frames_l[self.current_frame]
-                self.current_frame += 1
-                if self.current_frame == ENEMY_FRAMES_NUMBER:
-                    self.current_frame = 0
+        # Frame, the hit frame is the last one of the frame set
+        if self.is_hit and self.animator.finished():
+            self.is_hit = False
+            self.animator.play(ENEMY_ANIMATION)
+        if self.is_hit:
+            frame = ENEMY_FRAMES_NUMBER
         else:
-            if self.direction_right:
-                self.image = self.frames_r[self.current_frame]
-            else:
-                self.image = self.frames_l[self.current_frame]
-            if now - self.last_update > ENEMY_ANIMATION_FRAME_TIME:
-                self.last_update = now
-                self.current_frame = 0
-                self.is_hit = False
+            frame = self.animator.frame()
+        if self.direction_right:
+            self.image = self.frames_r[frame]
+        else:
+            self.image = self.frames_l[frame]
+        return
+
+    def wake(self):
+        # The animation follows the animation clock and the fire cooldown is a timestamp,
+        # so both are caught up with the game time that has passed while the enemy was asleep
+        self.animate()
         return
 
     def pass_values(self, player_x, player_y):
@@ -438,77 +337,67 @@ class Enemy:
         self.player_y = player_y
         return
 
-    def active(self):
+    def active(self, camera):
+        # The enemy is active while it is on the screen
         state = False
-        if WIDTH >= self.rect.x + ENEMY_WIDTH >= 0:
-            if self.rect.y + ENEMY_HEIGHT >= 0 and self.rect.y <= HEIGHT:
+        if camera.right >= self.rect.x + ENEMY_WIDTH >= camera.left:
+            if self.rect.y + ENEMY_HEIGHT >= camera.top and self.rect.y <= camera.bottom:
                 state = True
         return state
 
     def generate_fire(self):
         state = False
-        now = pygame.time.get_ticks()
-        now -= self.pause_time
+        now = frame_context.time
         if now - self.last_fire_time > ENEMY_FIRE_SPAWN_TIME_INTERVAL:
             self.last_fire_time = now
             state = True
         return state
 
-    def pass_pause_time(self, pause_time):
-        self.pause_time += pause_time
-        return
-
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
-        return
+    def draw(self, screen, camera, alpha):
+        rect = self.rect.move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class Coin:
     def __init__(self, world_number, x, y):
-        WORLD_INITIAL_X = WORLD_INITIAL_X_DIRECTORY[world_number-1]
-        WORLD_INITIAL_Y = WORLD_INITIAL_Y_DIRECTORY[world_number-1]
-        self.current_frame = 0
-        self.last_update = 0
+        self.animator = Animator(COIN_ANIMATION)
         self.load_images()
         self.image = self.frames[0]
         self.rect = self.image.get_rect()
-        self.rect.x = WORLD_INITIAL_X + x
-        self.rect.y = WORLD_INITIAL_Y + y
+        self.rect.x = x
+        self.rect.y = y
         self.kill = False
         return
 
     def load_images(self):
-        self.frames = []
-        for frame in range(COIN_FRAMES_NUMBER):
-            self.frames.append(pygame.image.load(f"assets/coin/{frame}.png"))
-            self.frames[frame] = pygame.transform.scale(self.frames[frame], (COIN_WIDTH, COIN_HEIGHT))
+        self.frames = frame_cache.load_frames("assets/coin", COIN_FRAMES_NUMBER, (COIN_WIDTH, COIN_HEIGHT))
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
+    def wake(self):
+        # Like Enemy.wake
         self.animate()
         return
 
+    def update(self, dt):
+        # Nothing changes from step to step, the frame is picked when the coin is drawn
+        return
+
     def animate(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > COIN_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            if self.current_frame != COIN_FRAMES_NUMBER - 1:
-                self.current_frame += 1
-            else:
-                self.current_frame = 0
-        self.image = self.frames[self.current_frame]
+        # Every coin shows the same frame, computed once per step by the animation clock
+        self.image = self.frames[self.animator.frame()]
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+    def draw(self, screen, camera, alpha):
+        self.animate()
+        rect = self.rect.move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class Splash:
     def __init__(self, position_rect):
-        self.current_frame = 0
-        self.last_update = 0
+        self.animator = Animator(SPLASH_ANIMATION, frame_context.time)
         self.load_images()
         self.image = self.frames[0]
         self.rect = self.image.get_rect()
@@ -518,119 +407,124 @@ class Splash:
         return
 
     def load_images(self):
-        self.frames = []
-        for frame in range(SPLASH_FRAMES_NUMBER):
-            self.frames.append(pygame.image.load(f"assets/splash/{frame}.png"))
-            self.frames[frame] = pygame.transform.scale(self.frames[frame], (SPLASH_WIDTH, SPLASH_HEIGHT))
+        self.frames = frame_cache.load_frames("assets/splash", SPLASH_FRAMES_NUMBER, (SPLASH_WIDTH, SPLASH_HEIGHT))
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
+    def update(self, dt):
         self.animate()
         return
 
     def animate(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > SPLASH_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            self.image = self.frames[self.current_frame]
-            self.current_frame += 1
-            if self.current_frame == SPLASH_FRAMES_NUMBER:
-                self.kill = True
+        # Played once, the splash dies at the end of its animation
+        if self.animator.finished():
+            self.kill = True
+        else:
+            self.image = self.frames[self.animator.frame()]
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
-        return
+    def draw(self, screen, camera, alpha):
+        rect = self.rect.move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class Fireball:
+    # Projectiles are pooled records (see ProjectilePool), spawn sets a record up again without allocating
+    __slots__ = ("animator", "direction_right", "frames", "image", "rect", "pos_x", "pos_y", "last_rect", "kill", "spawn_time")
+
     def __init__(self, position_rect, player_direction_right):
-        self.current_frame = 0
-        self.last_update = 0
-        self.last_motion_time_update = pygame.time.get_ticks()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.last_rect = pygame.Rect(0, 0, 0, 0)
+        self.animator = Animator(None)
+        self.spawn(position_rect, player_direction_right)
+        return
+
+    def spawn(self, position_rect, player_direction_right):
+        self.animator.play(FIREBALL_ANIMATION, frame_context.time)
         self.direction_right = player_direction_right
         self.load_images()
         self.image = self.frames[0]
-        self.rect = self.image.get_rect()
+        self.rect.size = self.image.get_size()
         if self.direction_right:
             self.rect.x = position_rect.x + FIREBALL_RIGHT_OFFSET_X
         else:
             self.rect.x = position_rect.x + FIREBALL_LEFT_OFFSET_X
         self.rect.y = position_rect.y + FIREBALL_OFFSET_Y
-        self.pause_time = 0
+        self.pos_x = self.rect.x    # Subpixel position, the rect is rounded from it
+        self.pos_y = self.rect.y
+        self.last_rect.update(self.rect)
         self.kill = False
+        self.spawn_time = frame_context.time
+        return
 
     def load_images(self):
-        self.frames = []
-        for frame in range(FIREBALL_FRAMES_NUMBER):
-            self.frames.append(pygame.image.load(f"assets/fireball/{frame}.png"))
-            self.frames[frame] = pygame.transform.scale(self.frames[frame], (FIREBALL_WIDTH, FIREBALL_HEIGHT))
-            if not self.direction_right:
-                self.frames[frame] = pygame.transform.flip(self.frames[frame], True, False)
-        return
-
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
-        self.move()
+        self.frames = frame_cache.load_frames("assets/fireball", FIREBALL_FRAMES_NUMBER, (FIREBALL_WIDTH, FIREBALL_HEIGHT), not self.direction_right)
+        return
+
+    def update(self, dt):
+        self.last_rect.update(self.rect)
+        self.move(dt)
         self.animate()
         return
 
-    def move(self):
-        now = pygame.time.get_ticks()
-        now -= self.pause_time
-        dt = now - self.last_motion_time_update
-        self.last_motion_time_update = now
+    def move(self, dt):
         if self.direction_right:
-            self.rect.x += int(dt * FIREBALL_VELOCITY_X)
+            self.pos_x += dt * FIREBALL_VELOCITY_X
         else:
-            self.rect.x -= int(dt * FIREBALL_VELOCITY_X)
-        self.rect.y += int(FIREBALL_Y_MOTION_INITIAL_VELOCITY * dt + FIREBALL_Y_GRAVITY_FACTOR * dt * dt)
+            self.pos_x -= dt * FIREBALL_VELOCITY_X
+        self.pos_y += FIREBALL_Y_MOTION_INITIAL_VELOCITY * dt + FIREBALL_Y_GRAVITY_FACTOR * dt * dt
+        self.rect.x = round(self.pos_x)
+        self.rect.y = round(self.pos_y)
         return
 
     def animate(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > FIREBALL_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            self.image = self.frames[self.current_frame]
-            self.current_frame += 1
-            if self.current_frame == FIREBALL_FRAMES_NUMBER:
-                self.current_frame = 0
-        return
-
-    def pass_pause_time(self, pause_time):
-        self.pause_time += pause_time
+        self.image = self.frames[self.animator.frame()]
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
-        return
+    def draw(self, screen, camera, alpha):
+        rect = interpolate(self.last_rect, self.rect, alpha).move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class Enemy_Fireball:
-    def __init__(self, enemy_x, enemy_y, player_x, player_y,):
-        self.current_frame = 0
-        self.last_update = 0
-        self.last_motion_time_update = pygame.time.get_ticks()
-        self.pause_time = 0
+    # Pooled record like Fireball
+    __slots__ = ("animator", "direction_right", "enemy_x", "enemy_y", "player_x", "player_y",
+                 "angle", "angle_bucket", "vel_x", "vel_y", "frames", "image", "rect", "pos_x", "pos_y", "last_rect", "kill", "spawn_time")
+
+    def __init__(self, enemy_x, enemy_y, player_x, player_y):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.last_rect = pygame.Rect(0, 0, 0, 0)
+        self.animator = Animator(None)
+        self.spawn(enemy_x, enemy_y, player_x, player_y)
+        return
+
+    def spawn(self, enemy_x, enemy_y, player_x, player_y):
+        self.animator.play(ENEMY_FIRE_ANIMATION, frame_context.time)
         self.direction_right = True
         self.enemy_x = enemy_x
         self.enemy_y = enemy_y
         self.player_x = player_x
         self.player_y = player_y
         self.angle = 0
+        self.angle_bucket = 0
+        self.vel_x = 0
+        self.vel_y = 0
         self.calculate_angle()
         self.load_images()
         self.image = self.frames[0]
-        self.rect = self.image.get_rect()
+        self.rect.size = self.image.get_size()
         if self.direction_right:
             self.rect.x = self.enemy_x + ENEMY_FIREBALL_RIGHT_OFFSET_X
         else:
             self.rect.x = self.enemy_x + ENEMY_FIREBALL_LEFT_OFFSET_X
         self.rect.y = self.enemy_y + ENEMY_FIREBALL_OFFSET_Y
+        self.pos_x = self.rect.x    # Subpixel position, the rect is rounded from it
+        self.pos_y = self.rect.y
+        self.last_rect.update(self.rect)
         self.kill = False
+        self.spawn_time = frame_context.time
+        return
 
     def calculate_angle(self):
         if self.player_x >= self.enemy_x:
@@ -644,61 +538,111 @@ class Enemy_Fireball:
         else:
             if self.enemy_x - self.player_x != 0:   # Divide by zero condition
                 self.angle = math.atan((self.player_y - self.enemy_y) / (self.enemy_x - self.player_x))
+
+        # Nearest pre-rotated sprite
+        self.angle_bucket = round(self.angle * ENEMY_FIRE_ANGLE_BUCKETS / (2 * math.pi))
+
+        # Velocity components are calculated once for the whole flight
+        if self.direction_right:
+            self.vel_x = ENEMY_FIREBALL_VELOCITY_X * math.cos(self.angle)
+            self.vel_y = -ENEMY_FIREBALL_VELOCITY_X * math.sin(self.angle)
+        else:
+            self.vel_x = -ENEMY_FIREBALL_VELOCITY_X * math.cos(self.angle)
+            self.vel_y = ENEMY_FIREBALL_VELOCITY_X * math.sin(self.angle)
         return
 
     def load_images(self):
-        self.frames = []
-        for frame in range(ENEMY_FIRE_FRAMES_NUMBER):
-            self.frames.append(pygame.image.load(f"assets/enemy/ghost/fireball/{frame}.png"))
-            self.frames[frame] = pygame.transform.scale(self.frames[frame], (ENEMY_FIRE_WIDTH, ENEMY_FIREBALL_HEIGHT))
-            if not self.direction_right:
-                self.frames[frame] = pygame.transform.flip(self.frames[frame], True, False)
-            self.frames[frame] = pygame.transform.rotate(self.frames[frame], math.degrees(self.angle))
-        return
-
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
-        self.move()
+        self.frames = load_enemy_fire_frames(not self.direction_right, self.angle_bucket)
+        return
+
+    def update(self, dt):
+        self.last_rect.update(self.rect)
+        self.move(dt)
         self.animate()
         return
 
-    def move(self):
-        now = pygame.time.get_ticks()
-        now -= self.pause_time
-        dt = now - self.last_motion_time_update
-        self.last_motion_time_update = now
-        if self.direction_right:
-            self.rect.x += int(dt * ENEMY_FIREBALL_VELOCITY_X * math.cos(self.angle))
-            self.rect.y -= int(dt * ENEMY_FIREBALL_VELOCITY_X * math.sin(self.angle))
-        else:
-            self.rect.x -= int(dt * ENEMY_FIREBALL_VELOCITY_X * math.cos(self.angle))
-            self.rect.y += int(dt * ENEMY_FIREBALL_VELOCITY_X * math.sin(self.angle))
+    def move(self, dt):
+        self.pos_x += dt * self.vel_x
+        self.pos_y += dt * self.vel_y
+        self.rect.x = round(self.pos_x)
+        self.rect.y = round(self.pos_y)
         return
 
     def animate(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > ENEMY_FIRE_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            self.image = self.frames[self.current_frame]
-            self.current_frame += 1
-            if self.current_frame == ENEMY_FIRE_FRAMES_NUMBER:
-                self.current_frame = 0
+        self.image = self.frames[self.animator.frame()]
+        return
+
+    def draw(self, screen, camera, alpha):
+        rect = interpolate(self.last_rect, self.rect, alpha).move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
+
+
+class ProjectilePool:
+    # Fixed number of projectile records created up front. A dead projectile goes back to the pool
+    # and its record is set up again for the next one, so spawning and despawning allocate nothing.
+    # The frames of the records are the shared frame sets of the frame cache.
+    def __init__(self, capacity, create):
+        self.records = [create() for i in range(capacity)]
+        self.free = list(self.records)
+        self.spawned = 0
+        self.dropped = 0
         return
 
-    def pass_pause_time(self, pause_time):
-        self.pause_time += pause_time
+    def spawn(self, *args):
+        # None when every record is in use, the projectile is dropped
+        if not self.free:
+            self.dropped += 1
+            return None
+        record = self.free.pop()
+        record.spawn(*args)
+        self.spawned += 1
+        return record
+
+    def release(self, record):
+        self.free.append(record)
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+    def release_all(self):
+        self.free[:] = self.records
         return
 
+    def live(self):
+        return len(self.records) - len(self.free)
+
+    def record_size(self):
+        # Bytes of a record with its rects, the frames are shared and not counted
+        record = self.records[0]
+        return sys.getsizeof(record) + sys.getsizeof(record.rect) + sys.getsizeof(record.last_rect)
+
+    def memory_usage(self):
+        return self.record_size() * len(self.records) + sys.getsizeof(self.records) + sys.getsizeof(self.free)
+
+    def report(self):
+        return (f"{type(self.records[0]).__name__} pool: {self.live()}/{len(self.records)} live, {self.record_size()} bytes per projectile, "
+                f"{self.spawned} spawned, {self.dropped} dropped, {self.memory_usage() // 1024} KB")
+
+
+def interpolate(last_rect, rect, alpha):
+    # Position between the last two simulation steps, alpha is the part of the step elapsed since the last one
+    return rect.move(int((last_rect.x - rect.x) * (1 - alpha)), int((last_rect.y - rect.y) * (1 - alpha)))
+
+
+def load_enemy_fire_frames(flip, angle_bucket):
+    return frame_cache.load_rotated_frames("assets/enemy/ghost/fireball", ENEMY_FIRE_FRAMES_NUMBER, (ENEMY_FIRE_WIDTH, ENEMY_FIREBALL_HEIGHT), flip, angle_bucket, ENEMY_FIRE_ANGLE_BUCKETS)
+
+
+def preload_enemy_fire_rotations():
+    # Enemy fire angles are between -90 and 90 degrees, so only a half circle of buckets is used for each direction
+    for angle_bucket in range(-(ENEMY_FIRE_ANGLE_BUCKETS // 4), ENEMY_FIRE_ANGLE_BUCKETS // 4 + 1):
+        load_enemy_fire_frames(False, angle_bucket)
+        load_enemy_fire_frames(True, angle_bucket)
+    return
+
 
 class Explosion:
     def __init__(self, position_rect):
-        self.current_frame = 0
-        self.last_update = 0
+        self.animator = Animator(EXPLOSION_ANIMATION, frame_context.time)
         self.load_images()
         self.image = self.frames[0]
         self.rect = self.image.get_rect()
@@ -708,121 +652,137 @@ class Explosion:
         return
 
     def load_images(self):
-        self.frames = []
-        for frame in range(EXPLOSION_FRAMES_NUMBER):
-            self.frames.append(pygame.image.load(f"assets/explosion/{frame}.png"))
-            self.frames[frame] = pygame.transform.scale(self.frames[frame], (EXPLOSION_WIDTH, EXPLOSION_HEIGHT))
+        self.frames = frame_cache.load_frames("assets/explosion", EXPLOSION_FRAMES_NUMBER, (EXPLOSION_WIDTH, EXPLOSION_HEIGHT))
         return
 
-    def update(self, dx, dy):
-        self.rect.x -= dx
-        self.rect.y -= dy
+    def update(self, dt):
         self.animate()
         return
 
     def animate(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > EXPLOSION_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            self.image = self.frames[self.current_frame]
-            self.current_frame += 1
-            if self.current_frame == EXPLOSION_FRAMES_NUMBER:
-                self.kill = True
+        # Played once, the explosion dies at the end of its animation
+        if self.animator.finished():
+            self.kill = True
+        else:
+            self.image = self.frames[self.animator.frame()]
         return
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
-        return
+    def draw(self, screen, camera, alpha):
+        rect = self.rect.move(-camera.x, -camera.y)
+        screen.blit(self.image, rect)
+        return rect
 
 
 class MiscBar:
+    # The HUD is drawn in its own layer, which is rebuilt only when a value changes,
+    # the animated coin is blitted over the layer
     def __init__(self, player):
         self.current_frame = 0
-        self.last_update = 0
+        self.animator = Animator(MISCBAR_COIN_ANIMATION)
         self.life = player.life
         self.coin = player.coins_collected
         self.world = 0
         self.lives = 0
         self.load_images()
+        self.layer = pygame.Surface((WIDTH, MISCBAR_LAYER_HEIGHT), pygame.SRCALPHA)
+        self.rect = self.layer.get_rect()
+        self.dirty = True
+        self.rebuilds = 0
+        self.draws = 0
         self.kill = False
         return
 
     def load_images(self):
-        self.player_head_image = pygame.image.load("assets/miscbar/head/head.png")
-        self.player_head_image = pygame.transform.scale(self.player_head_image, (MISCBAR_PLAYER_HEAD_WIDTH, MISCBAR_PLAYER_HEAD_HEIGHT))
-
-        self.coin_frames = []
-        for frame in range(MISCBAR_COIN_FRAMES_NUMBER):
-            self.coin_frames.append(pygame.image.load(f"assets/coin/{frame}.png"))
-            self.coin_frames[frame] = pygame.transform.scale(self.coin_frames[frame], (MISCBAR_COIN_WIDTH, MISCBAR_COIN_HEIGHT))
+        self.player_head_image = frame_cache.load_image("assets/miscbar/head/head.png", (MISCBAR_PLAYER_HEAD_WIDTH, MISCBAR_PLAYER_HEAD_HEIGHT))
+        self.coin_frames = frame_cache.load_frames("assets/coin", MISCBAR_COIN_FRAMES_NUMBER, (MISCBAR_COIN_WIDTH, MISCBAR_COIN_HEIGHT))
         return
 
     def pass_values(self, player):
+        if (self.life, self.coin, self.world, self.lives) != (player.life, player.coins_collected, player.world, player.lives):
+            self.dirty = True
         self.life = player.life
         self.coin = player.coins_collected
         self.world = player.world
         self.lives = player.lives
         return
 
-    def update(self, dx, dy):
-        # Does not have anything to update
+    def update(self):
+        self.animate()
+        return
+
+    def animate(self):
+        # Coin Image Animation
+        self.current_frame = self.animator.frame()
         return
 
     def draw_lifebar(self, screen):
         # Lifebar Background
-        lifebar_background = pygame.Surface((MISCBAR_LIFEBAR_WIDTH + LIFEBAR_GAP, MISCBAR_LIFEBAR_HEIGHT + 2 * LIFEBAR_GAP))
-        lifebar_background.fill(MISCBAR_LIFEBAR_BACKGROUND_COLOR)
-        screen.blit(lifebar_background, (MISCBAR_LIFEBAR_POS_X, MISCBAR_LIFEBAR_POS_Y - LIFEBAR_GAP))
+        screen.fill(MISCBAR_LIFEBAR_BACKGROUND_COLOR, (MISCBAR_LIFEBAR_POS_X, MISCBAR_LIFEBAR_POS_Y - LIFEBAR_GAP, MISCBAR_LIFEBAR_WIDTH + LIFEBAR_GAP, MISCBAR_LIFEBAR_HEIGHT + 2 * LIFEBAR_GAP))
 
         # Lifebar Foreground
         # Bar color
-        RED_VALUE = int(237 * (1 - self.life / PLAYER_INITIAL_LIFE))
-        GREEN_VALUE = int(41 + (255 - 41) * (self.life / PLAYER_INITIAL_LIFE))
-        BLUE_VALUE = int(56 + (127 - 56) * (self.life / PLAYER_INITIAL_LIFE))
+        life_ratio = min(max(self.life / PLAYER_INITIAL_LIFE, 0), 1)
+        RED_VALUE = int(237 * (1 - life_ratio))
+        GREEN_VALUE = int(41 + (255 - 41) * life_ratio)
+        BLUE_VALUE = int(56 + (127 - 56) * life_ratio)
         BAR_VALUE = (RED_VALUE, GREEN_VALUE, BLUE_VALUE)
 
         # Colored Bar
-        life_percentage = int(MISCBAR_LIFEBAR_WIDTH * (self.life / PLAYER_INITIAL_LIFE))
-        lifebar_foreground = pygame.Surface((life_percentage, MISCBAR_LIFEBAR_HEIGHT))
-        lifebar_foreground.fill(BAR_VALUE)
-        screen.blit(lifebar_foreground, (MISCBAR_LIFEBAR_POS_X, MISCBAR_LIFEBAR_POS_Y))
+        life_percentage = int(MISCBAR_LIFEBAR_WIDTH * life_ratio)
+        screen.fill(BAR_VALUE, (MISCBAR_LIFEBAR_POS_X, MISCBAR_LIFEBAR_POS_Y, life_percentage, MISCBAR_LIFEBAR_HEIGHT))
 
         # Player's head image
         screen.blit(self.player_head_image, (MISCBAR_PLAYERS_HEAD_POS_X, MISCBAR_PLAYERS_HEAD_POS_Y))
         return
 
     def draw_coins_collected(self, screen):
-        # Coin Image Animation
-        now = pygame.time.get_ticks()
-        if now - self.last_update > MISCBAR_COIN_ANIMATION_FRAME_TIME:
-            self.last_update = now
-            if self.current_frame != MISCBAR_COIN_FRAMES_NUMBER - 1:
-                self.current_frame += 1
-            else:
-                self.current_frame = 0
-        screen.blit(self.coin_frames[self.current_frame], (MISCBAR_COIN_POSITION_X, MISCBAR_COIN_POSITION_Y))
-
         # Coin Number Text
-        font = pygame.font.Font(GAME_FONT, MISCBAR_COIN_NUMBER_FONT_SIZE)
-        text = font.render(str(self.coin), True, MISCBAR_COIN_NUMBER_FONT_COLOR)
+        text = text_cache.render(str(self.coin), MISCBAR_COIN_NUMBER_FONT_SIZE, MISCBAR_COIN_NUMBER_FONT_COLOR)
         screen.blit(text, (MISCBAR_COIN_NUMBER_POS_X, MISCBAR_COIN_NUMBER_POS_Y))
         return
 
     def draw_lives_left(self, screen):
-        font = pygame.font.Font(GAME_FONT, MISCBAR_LIVES_NUMBER_FONT_SIZE)
-        text = font.render(f"LIVES {str(self.lives)}", True, MISCBAR_LIVES_NUMBER_FONT_COLOR)
+        text = text_cache.render(f"LIVES {str(self.lives)}", MISCBAR_LIVES_NUMBER_FONT_SIZE, MISCBAR_LIVES_NUMBER_FONT_COLOR)
         screen.blit(text, (MISCBAR_LIVES_NUMBER_POS_X, MISCBAR_LIVES_NUMBER_POS_Y))
         return
 
     def draw_world_name(self, screen):
-        font = pygame.font.Font(GAME_FONT, MISCBAR_WORLD_NUMBER_FONT_SIZE)
-        text = font.render(f"WORLD {str(self.world)}", True, MISCBAR_WORLD_NUMBER_FONT_COLOR)
+        text = text_cache.render(f"WORLD {str(self.world)}", MISCBAR_WORLD_NUMBER_FONT_SIZE, MISCBAR_WORLD_NUMBER_FONT_COLOR)
         screen.blit(text, (MISCBAR_WORLD_NUMBER_POS_X + 200, MISCBAR_WORLD_NUMBER_POS_Y))
         return
 
-    def draw(self, screen):
-        self.draw_coins_collected(screen)
-        self.draw_lifebar(screen)
-        self.draw_lives_left(screen)
-        self.draw_world_name(screen)
+    def rebuild_layer(self):
+        self.layer.fill((0, 0, 0, 0))
+        self.draw_coins_collected(self.layer)
+        self.draw_lifebar(self.layer)
+        self.draw_lives_left(self.layer)
+        self.draw_world_name(self.layer)
+        self.dirty = False
+        self.rebuilds += 1
         return
+
+    def draw(self, screen):
+        if self.dirty:
+            self.rebuild_layer()
+        screen.blit(self.layer, self.rect)
+        screen.blit(self.coin_frames[self.current_frame], (self.rect.x + MISCBAR_COIN_POSITION_X, self.rect.y + MISCBAR_COIN_POSITION_Y))
+        self.draws += 1
+        return
+
+    def report(self):
+        return f"HUD {self.rebuilds} REBUILDS  {self.draws} DRAWS"
+
+
+def load_all_frames():
+    # Creating one object of every animated class puts every frame set of the game in the frame cache
+    player = Player(1)
+    MiscBar(player)
+    Enemy(1, 0, 0)
+    Coin(1, 0, 0)
+    Splash(player.rect)
+    Fireball(player.rect, True)
+    Fireball(player.rect, False)
+    Enemy_Fireball(0, 0, 1, 0)
+    Enemy_Fireball(0, 0, -1, 0)
+    Explosion(player.rect)
+    return
@@ -0,0 +1,361 @@
+# Benchmarks for the loading and rendering paths of the game
+#   python benchmarks.py            runs all the benchmarks
+#   python benchmarks.py atlas      runs only the named benchmark
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+import pygame
+from assets import *
+from resources import prepare_surface, MusicStream
+from display import Presenter
+from collisions import SpatialHash, CollisionGroup
+from entities import EntityList, SleepScheduler
+
+REPEATS = 5
+
+
+def measure(function, repeats=REPEATS):
+    # Best time of the repeats in ms
+    best = None
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchmark_atlas():
+    # Cold loading of every sprite frame from the separate image files and from the baked atlas
+    def load_from_files():
+        frame_cache.atlas = None
+        frame_cache.clear()
+        load_all_frames()
+
+    def load_from_atlas():
+        frame_cache.atlas = None
+        frame_cache.clear()
+        frame_cache.load_atlas(ATLAS_IMAGE, ATLAS_INDEX)
+        load_all_frames()
+
+    files_time = measure(load_from_files)
+    print(f"Image files: {files_time:.1f} ms for {len(frame_cache.files)} frames")
+    frame_cache.load_atlas(ATLAS_IMAGE, ATLAS_INDEX)
+    if frame_cache.atlas is None:
+        print(f"Atlas: {ATLAS_IMAGE} not found, run python build_atlas.py first")
+        return
+    atlas_time = measure(load_from_atlas)
+    print(f"Atlas: {atlas_time:.1f} ms for {len(frame_cache.files)} frames ({files_time / atlas_time:.1f}x faster)")
+    return
+
+
+def benchmark_blit():
+    # Time to draw a frame of the world with the surfaces as they are loaded and converted to the display format
+    screen = pygame.display.get_surface().copy()
+    tiles = pygame.transform.scale(pygame.image.load(WORLD_TILES_DIRECTORY[0]), (WORLD_WIDTH_DIRECTORY[0], WORLD_HEIGHT_DIRECTORY[0]))
+    tiles.set_colorkey(WORLD_TILES_COLORKEY)
+    background = pygame.transform.scale(pygame.image.load(WORLD_BACKGROUND_DIRECTORY[0]), (1920, 1080))
+    sprites = []
+    for frame in range(COIN_FRAMES_NUMBER):
+        sprites.append(pygame.transform.scale(pygame.image.load(f"assets/coin/{frame}.png"), (COIN_WIDTH, COIN_HEIGHT)))
+    for frame in range(ENEMY_FRAMES_NUMBER):
+        sprites.append(pygame.transform.scale(pygame.image.load(f"assets/enemy/ghost/{frame}.png"), (ENEMY_WIDTH, ENEMY_HEIGHT)))
+    loaded = (tiles, background, sprites)
+    converted = (prepare_surface(tiles, WORLD_TILES_SURFACE_FORMAT, WORLD_TILES_COLORKEY),
+                 prepare_surface(background, WORLD_BACKGROUND_SURFACE_FORMAT),
+                 [prepare_surface(sprite, SPRITE_SURFACE_FORMAT) for sprite in sprites])
+
+    def draw_frames(surfaces, frames=60):
+        tiles, background, sprites = surfaces
+        for frame in range(frames):
+            screen.blit(background, (-frame, -300))
+            screen.blit(tiles, (-frame, HEIGHT - WORLD_HEIGHT_DIRECTORY[0]))
+            for i in range(50):
+                screen.blit(sprites[i % len(sprites)], ((i * 97) % WIDTH, (i * 53) % HEIGHT))
+
+    loaded_time = measure(lambda: draw_frames(loaded)) / 60
+    converted_time = measure(lambda: draw_frames(converted)) / 60
+    print(f"Loaded surfaces: {loaded_time:.2f} ms per frame")
+    print(f"Display format surfaces: {converted_time:.2f} ms per frame ({loaded_time / converted_time:.1f}x faster)")
+    return
+
+
+def benchmark_scale():
+    # Time and surface allocations to present a frame on windows of different sizes
+    for size in ((WIDTH, HEIGHT), (1920, 1080), (3840, 2160)):
+        screen = pygame.display.set_mode(size)
+        fake_screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+        fake_screen.fill(GREEN)
+
+        def allocating_scale():
+            for frame in range(30):
+                screen.blit(pygame.transform.scale(fake_screen, screen.get_size()), (0, 0))
+                pygame.display.flip()
+
+        presenter = Presenter(screen, fake_screen)
+
+        def presenter_scale():
+            for frame in range(30):
+                presenter.present()
+
+        allocating_time = measure(allocating_scale) / 30
+        presenter_time = measure(presenter_scale) / 30
+        print(f"{size[0]}x{size[1]}: scale and blit {allocating_time:.2f} ms, 1 allocation per frame; "
+              f"presenter ({presenter.scaling}) {presenter_time:.2f} ms, {presenter.allocations} allocations in {presenter.full_updates} frames")
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    return
+
+
+def benchmark_collisions():
+    # Time of a step of collision detection between N projectiles and N platforms, testing every pair and with the grids.
+    # The world grows with the number of objects, so their density stays the one of a busy level.
+    random.seed(0)
+    for number in (250, 500, 1000, 2000, 4000):
+        world_width = number * 20
+        platforms = []
+        fireballs = []
+        for i in range(number):
+            platforms.append(Platform(1, random.randrange(world_width), random.randrange(1080), random.randint(50, 300), 20))
+            fireballs.append(Fireball(pygame.Rect(random.randrange(world_width), random.randrange(1080), 0, 0), True))
+
+        def every_pair():
+            hits = 0
+            for fireball in fireballs:
+                for platform in platforms:
+                    if fireball.rect.colliderect(platform.rect):
+                        hits += 1
+            return hits
+
+        # The platforms are inserted once, the projectiles are binned again in every step
+        platforms_grid = SpatialHash()
+        for platform in platforms:
+            platforms_grid.insert(platform)
+        fireballs_grid = SpatialHash()
+
+        def grid():
+            fireballs_grid.rebuild(fireballs)
+            hits = 0
+            for fireball in fireballs:
+                hits += len(platforms_grid.query(fireball.rect))
+            return hits
+
+        assert every_pair() == grid()
+        every_pair_time = measure(every_pair, 1)
+        grid_time = measure(grid)
+        print(f"{number} projectiles and platforms: every pair {every_pair_time:.1f} ms, "
+              f"grid {grid_time:.2f} ms ({every_pair_time / grid_time:.0f}x faster, {grid_time * 1000 / number:.2f} us per projectile)")
+    return
+
+
+def benchmark_projectiles():
+    # Time of the projectile collision tests of a step with N fireballs and N enemy fireballs on a screen,
+    # against the platforms and enemies of a level, with each collision backend
+    random.seed(0)
+    backends = ["grid"]
+    if CollisionGroup([], "numpy").batch:
+        backends.append("numpy")
+    else:
+        print("numpy is not installed, only the grid backend is measured")
+    player = Player(1)
+    platforms = [Platform(1, random.randrange(1920), random.randrange(1080), random.randint(50, 300), 20) for i in range(50)]
+    enemies = [Enemy(1, random.randrange(1920), random.randrange(1080)) for i in range(20)]
+    for number in (100, 250, 500, 1000):
+        fireballs = [Fireball(pygame.Rect(random.randrange(1920), random.randrange(1080), 0, 0), True) for i in range(number)]
+        enemy_fire = [Enemy_Fireball(random.randrange(1920), random.randrange(1080), 0, 0) for i in range(number)]
+        times = {}
+        for backend in backends:
+            player_group = CollisionGroup([player], backend)
+            platforms_group = CollisionGroup(platforms, backend)
+            enemies_group = CollisionGroup(enemies, backend)
+            fireballs_group = CollisionGroup(fireballs, backend)
+            enemy_fire_group = CollisionGroup(enemy_fire, backend)
+
+            def step():
+                fireballs_group.update()
+                enemy_fire_group.update()
+                hits = len(fireballs_group.hits(platforms_group))
+                hits += len(fireballs_group.hits(enemies_group))
+                hits += len(player_group.hits(enemy_fire_group))
+                hits += len(enemy_fire_group.hits(fireballs_group))
+                return hits
+
+            times[backend] = measure(step)
+            times[backend + " hits"] = step()
+        assert all(times[backend + " hits"] == times["grid hits"] for backend in backends)
+        print(f"{number} fireballs and {number} enemy fireballs: "
+              + ", ".join(f"{backend} {times[backend]:.2f} ms" for backend in backends) + " per step "
+              f"({times['grid hits']} hits, {SIMULATION_STEP:.1f} ms per step at {SIMULATION_RATE} steps per second)")
+    return
+
+
+def benchmark_pool():
+    # Time to spawn and despawn projectiles by creating objects and with the pools, and memory per live projectile
+    player = Player(1)
+    for projectile_class, capacity, args in ((Fireball, FIREBALL_POOL_SIZE, (player.rect, True)),
+                                             (Enemy_Fireball, ENEMY_FIRE_POOL_SIZE, (0, 0, 100, 50))):
+        pool = ProjectilePool(capacity, lambda: projectile_class(*args))
+
+        def create():
+            projectiles = []
+            for i in range(capacity):
+                projectiles.append(projectile_class(*args))
+
+        def spawn_and_release():
+            for i in range(capacity):
+                pool.spawn(*args)
+            pool.release_all()
+
+        # The same record without __slots__ keeps its attributes in a dict
+        record = pool.records[0]
+        unslotted = type("Unslotted", (), {})()
+        for name in type(record).__slots__:
+            setattr(unslotted, name, getattr(record, name))
+        unslotted_size = sys.getsizeof(unslotted) + sys.getsizeof(unslotted.__dict__) + sys.getsizeof(record.rect) + sys.getsizeof(record.last_rect)
+        create_time = measure(create)
+        pool_time = measure(spawn_and_release)
+        print(f"{projectile_class.__name__}: {capacity} created {create_time:.2f} ms, spawned from the pool {pool_time:.2f} ms; "
+              f"{pool.record_size()} bytes per projectile ({unslotted_size} with a dict)")
+        print(pool.report())
+    return
+
+
+def benchmark_cleanup():
+    # Time to remove 50 dead entities from N live ones, with list.remove and with an entity list
+    random.seed(0)
+    for number in (1000, 10000, 100000):
+        entities = [Coin(1, 0, 0) for i in range(number)]
+        dead = random.sample(entities, 50)
+
+        def list_remove():
+            live = list(entities)
+            start = time.perf_counter()
+            for entity in dead:
+                live.remove(entity)
+            return time.perf_counter() - start
+
+        def entity_list_remove():
+            live = EntityList(entities)
+            start = time.perf_counter()
+            for entity in dead:
+                live.remove(entity)
+            return time.perf_counter() - start
+
+        # Only the removals are timed, not the copies of the lists
+        list_time = min(list_remove() for repeat in range(REPEATS)) * 1000
+        entity_list_time = min(entity_list_remove() for repeat in range(REPEATS)) * 1000
+        print(f"{number} entities, 50 deaths: list.remove {list_time:.3f} ms, entity list {entity_list_time:.3f} ms")
+    return
+
+
+def benchmark_sleep():
+    # Time of a step over N enemies spread along a long world, updating all of them and with a sleep scheduler
+    random.seed(0)
+    camera = pygame.Rect(0, 0, WIDTH, HEIGHT)
+    for number in (100, 1000, 10000):
+        enemies = [Enemy(1, random.randrange(0, 100 * number), random.randrange(0, HEIGHT)) for i in range(number)]
+        assets = EntityList()
+        scheduler = SleepScheduler(enemies, assets)
+
+        def update_all():
+            for enemy in enemies:
+                enemy.update(SIMULATION_STEP)
+
+        def update_awake():
+            scheduler.schedule(camera)
+            for asset in assets:
+                asset.update(SIMULATION_STEP)
+
+        all_time = measure(update_all)
+        awake_time = measure(update_awake)
+        print(f"{number} enemies: all updated {all_time:.3f} ms, {len(scheduler.awake)} awake {awake_time:.3f} ms")
+    return
+
+
+def resident_memory():
+    # Resident set of the process in bytes, None where /proc is not available
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def benchmark_music():
+    # Resident memory added by a music track decoded into a Sound and streamed by a MusicStream, for tracks of N seconds
+    pygame.mixer.init()
+    frequency, sample_format, channels = pygame.mixer.get_init()
+    directory = tempfile.mkdtemp()
+    for seconds in (30, 120, 300):
+        track = os.path.join(directory, f"track_{seconds}.wav")
+        with wave.open(track, "wb") as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(abs(sample_format) // 8)
+            wav.setframerate(frequency)
+            wav.writeframes(bytes(frequency * channels * abs(sample_format) // 8 * seconds))
+
+        sound_usage = measure_in_process("sound", track)
+        stream_usage = measure_in_process("stream", track)
+        os.remove(track)
+        if sound_usage is None:
+            print(f"{seconds} s track: resident memory is not available on this platform")
+        else:
+            print(f"{seconds} s track: Sound {sound_usage // 1024} KB, stream {stream_usage // 1024} KB")
+    os.rmdir(directory)
+    return
+
+
+def music_memory(player, track):
+    # Resident memory added by playing the track, None where it cannot be measured
+    pygame.mixer.init()
+    before = resident_memory()
+    if player == "sound":
+        sound = pygame.mixer.Sound(track)
+        sound.play()
+    else:
+        music = MusicStream()
+        music.play(track)
+    after = resident_memory()
+    if before is None:
+        return None
+    return after - before
+
+
+def measure_in_process(player, track):
+    # Runs the measurement in a fresh process, where no memory freed by the earlier benchmarks can be reused
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--music-memory", player, track],
+                            capture_output=True, text=True, check=True)
+    usage = result.stdout.split()[-1]
+    if usage == "None":
+        return None
+    return int(usage)
+
+
+BENCHMARKS = {
+    "atlas": benchmark_atlas,
+    "blit": benchmark_blit,
+    "scale": benchmark_scale,
+    "collisions": benchmark_collisions,
+    "projectiles": benchmark_projectiles,
+    "pool": benchmark_pool,
+    "cleanup": benchmark_cleanup,
+    "sleep": benchmark_sleep,
+    "music": benchmark_music,
+}
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--music-memory"]:
+        # Measurement of benchmark_music, run in its own process
+        print(music_memory(*sys.argv[2:4]))
+        sys.exit()
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
+    pygame.quit()
@@ -0,0 +1,64 @@
+# Bakes the assets of the game for fast loading:
+# every sprite frame, already scaled and flipped, in a single atlas file plus an index,
+# and the tiles of every world, already scaled, in chunks of WORLD_CHUNK_WIDTH pixels.
+# It has to be run again when a sprite, a world or their sizes in parameters.py change:
+#   python build_atlas.py
+import json
+import os
+import pygame
+from assets import *
+from resources import bake_world_chunks
+
+
+def pack_frames(frames):
+    # Shelf packing: the frames are sorted by height and placed in rows of ATLAS_WIDTH pixels
+    rects = {}
+    x = 0
+    y = 0
+    row_height = 0
+    for key, frame in sorted(frames.items(), key=lambda item: -item[1].get_height()):
+        width, height = frame.get_size()
+        if x + width > ATLAS_WIDTH:
+            x = 0
+            y += row_height
+            row_height = 0
+        rects[key] = (x, y, width, height)
+        x += width
+        row_height = max(row_height, height)
+    return rects, y + row_height
+
+
+def build_atlas():
+    frame_cache.atlas = None
+    frame_cache.clear()
+    load_all_frames()
+
+    rects, atlas_height = pack_frames(frame_cache.files)
+    atlas = pygame.Surface((ATLAS_WIDTH, atlas_height), pygame.SRCALPHA)
+    index = {"width": ATLAS_WIDTH, "height": atlas_height, "frames": []}
+    for (path, size, flip), rect in rects.items():
+        # RGBA_MAX on a transparent atlas copies the pixels together with their alpha without blending
+        atlas.blit(frame_cache.files[(path, size, flip)], rect[:2], special_flags=pygame.BLEND_RGBA_MAX)
+        index["frames"].append({"path": path, "size": list(size), "flip": flip, "rect": list(rect)})
+
+    os.makedirs(os.path.dirname(ATLAS_IMAGE), exist_ok=True)
+    with open(ATLAS_IMAGE, "wb") as image_file:
+        image_file.write(pygame.image.tobytes(atlas, "RGBA"))
+    with open(ATLAS_INDEX, "w") as index_file:
+        json.dump(index, index_file)
+    print(f"{len(rects)} frames baked in {ATLAS_IMAGE} ({ATLAS_WIDTH}x{atlas_height})")
+    return
+
+
+def build_world_chunks():
+    for world_number in range(1, NUMBER_OF_WORLDS + 1):
+        chunks_number = bake_world_chunks(world_number)
+        print(f"World {world_number}: {chunks_number} chunks baked in {WORLD_CHUNKS_DIRECTORY}/world_{world_number}")
+    return
+
+
+if __name__ == "__main__":
+    pygame.init()
+    build_atlas()
+    build_world_chunks()
+    pygame.quit()
@@ -0,0 +1,180 @@
+# Broadphase of the collision detection
+import math
+from parameters import *
+try:
+    import numpy
+except ImportError:
+    # Without numpy the grid backend is used
+    numpy = None
+
+
+class SpatialHash:
+    # Uniform grid of square cells, every object is listed in the cells that its rect overlaps.
+    # A query only tests the objects of the cells around the rect instead of every object.
+    # Static objects are inserted once, moving objects are binned again after every move (see rebuild).
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        return
+
+    def cells_of(self, rect):
+        size = self.cell_size
+        for x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield x, y
+        return
+
+    def insert(self, obj):
+        for cell in self.cells_of(obj.rect):
+            self.cells.setdefault(cell, []).append(obj)
+        return
+
+    def remove(self, obj):
+        # The object has to be at the position where it was inserted
+        for cell in self.cells_of(obj.rect):
+            objects = self.cells.get(cell)
+            if objects is not None and obj in objects:
+                objects.remove(obj)
+                if not objects:
+                    del self.cells[cell]
+        return
+
+    def rebuild(self, objects):
+        self.cells = {}
+        for obj in objects:
+            self.insert(obj)
+        return
+
+    def query(self, rect):
+        # Objects whose rect collides with rect, each one once
+        found = {}
+        for cell in self.cells_of(rect):
+            for obj in self.cells.get(cell, ()):
+                if obj not in found and rect.colliderect(obj.rect):
+                    found[obj] = None
+        return list(found)
+
+
+def swept_collision(rect, dx, dy, obstacle):
+    # Swept AABB test of rect moving by (dx, dy) against the obstacle rect.
+    # Returns the time of impact, between 0 (start of the move) and 1 (end of the move), and the normal of the face hit,
+    # or None when the move does not hit the obstacle or when rect already overlaps it at the start.
+    if dx > 0:
+        entry_x = (obstacle.left - rect.right) / dx
+        exit_x = (obstacle.right - rect.left) / dx
+    elif dx < 0:
+        entry_x = (obstacle.right - rect.left) / dx
+        exit_x = (obstacle.left - rect.right) / dx
+    elif rect.right > obstacle.left and rect.left < obstacle.right:
+        entry_x = -math.inf
+        exit_x = math.inf
+    else:
+        return None
+    if dy > 0:
+        entry_y = (obstacle.top - rect.bottom) / dy
+        exit_y = (obstacle.bottom - rect.top) / dy
+    elif dy < 0:
+        entry_y = (obstacle.bottom - rect.top) / dy
+        exit_y = (obstacle.top - rect.bottom) / dy
+    elif rect.bottom > obstacle.top and rect.top < obstacle.bottom:
+        entry_y = -math.inf
+        exit_y = math.inf
+    else:
+        return None
+    entry = max(entry_x, entry_y)
+    if entry < 0 or entry > 1 or entry >= min(exit_x, exit_y):
+        return None
+    if entry_x > entry_y:
+        return entry, (-1 if dx > 0 else 1), 0
+    return entry, 0, (-1 if dy > 0 else 1)
+
+
+def swept_hit(obj, other):
+    # Swept test of two objects that both moved in the step, from their last_rect to their rect:
+    # the move of obj relative to other is tested against other at the start of the step. Returns like swept_collision.
+    dx = (obj.rect.x - obj.last_rect.x) - (other.rect.x - other.last_rect.x)
+    dy = (obj.rect.y - obj.last_rect.y) - (other.rect.y - other.last_rect.y)
+    if not dx and not dy:
+        return None
+    return swept_collision(obj.last_rect, dx, dy, other.last_rect)
+
+
+def rects_array(objects):
+    # Rects of the objects as contiguous rows of left, top, right and bottom, with one column per object
+    x, y, w, h = numpy.array([tuple(obj.rect) for obj in objects], dtype=numpy.int32).reshape(-1, 4).T
+    rects = numpy.array((x, y, x + w, y + h))
+    # Like Rect.colliderect, empty rects collide with nothing, they are turned inside out
+    empty = (w <= 0) | (h <= 0)
+    rects[:2, empty] = numpy.iinfo(numpy.int32).max
+    rects[2:, empty] = numpy.iinfo(numpy.int32).min
+    return rects
+
+
+class CollisionGroup:
+    # Objects whose collisions are detected together, indexed for the collision backend (COLLISION_BACKEND):
+    # "grid" bins them in a SpatialHash, "numpy" keeps their rects in an array and tests all the pairs of two groups at once
+    def __init__(self, objects, backend=COLLISION_BACKEND):
+        self.objects = objects
+        self.batch = backend == "numpy" and numpy is not None
+        self.grid = SpatialHash()
+        self.rects = None
+        self.update()
+        return
+
+    def update(self):
+        # Indexes the objects again, after they have moved or the list of objects has changed
+        if self.batch:
+            self.rects = rects_array(self.objects)
+        else:
+            self.grid.rebuild(self.objects)
+        return
+
+    def remove(self, obj):
+        # Called after obj has been removed from the list of objects
+        if self.batch:
+            self.rects = rects_array(self.objects)
+        else:
+            self.grid.remove(obj)
+        return
+
+    def hit_indices(self, other):
+        # Index pairs (i, j) of the colliding objects[i] and other.objects[j], in the order of i and then of j
+        left, top, right, bottom = self.rects[:, :, None]
+        other_left, other_top, other_right, other_bottom = other.rects[:, None, :]
+        colliding = left < other_right
+        colliding &= right > other_left
+        colliding &= top < other_bottom
+        colliding &= bottom > other_top
+        return numpy.nonzero(colliding)
+
+    def query(self, rect):
+        # Objects of the group that collide with rect
+        if self.batch:
+            if not rect.width or not rect.height:
+                return []
+            left, top, right, bottom = self.rects
+            colliding = (left < rect.right) & (right > rect.left) & (top < rect.bottom) & (bottom > rect.top)
+            return [self.objects[i] for i in numpy.nonzero(colliding)[0]]
+        return self.grid.query(rect)
+
+    def sweep(self, rect, dx, dy):
+        # First object of the group hit by rect moving by (dx, dy), as (time, normal_x, normal_y, object), or None
+        first = None
+        if dx or dy:
+            for obj in self.query(rect.union(rect.move(dx, dy))):
+                hit = swept_collision(rect, dx, dy, obj.rect)
+                if hit is not None and (first is None or hit[0] < first[0]):
+                    first = hit + (obj,)
+        return first
+
+    def hits(self, other):
+        # (object, other object) pairs of colliding objects of the two groups
+        hits = []
+        if self.batch:
+            for i, j in zip(*self.hit_indices(other)):
+                hits.append((self.objects[i], other.objects[j]))
+        else:
+            for obj in self.objects:
+                for other_obj in other.grid.query(obj.rect):
+                    hits.append((obj, other_obj))
+        return hits
@@ -0,0 +1,110 @@
+# Presentation of the fake screen on the window
+import time
+import pygame
+from parameters import *
+
+
+def create_window(size):
+    # With "display" scaling SDL scales the window itself and the game draws straight on it
+    if WINDOW_SCALING == "display":
+        return pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED | pygame.RESIZABLE)
+    return pygame.display.set_mode(size, pygame.HWSURFACE | pygame.DOUBLEBUF | pygame.RESIZABLE)
+
+
+class Presenter:
+    # Scales the fake screen to the window size and shows it.
+    # The fake screen is scaled straight into the window surface, so presenting a frame allocates no surface.
+    # In dirty rectangles mode only the changed parts are scaled and updated, unless the whole screen has changed.
+    def __init__(self, screen, fake_screen):
+        self.fake_screen = fake_screen
+        self.full_update_needed = True
+        self.pixels_presented = 0
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.allocations = 0
+        self.present_time = 0
+        self.resize(screen)
+        return
+
+    def resize(self, screen):
+        self.screen = screen
+        self.full_update_needed = True
+        window_width, window_height = screen.get_size()
+        fake_width, fake_height = self.fake_screen.get_size()
+        self.scale_x = window_width / fake_width
+        self.scale_y = window_height / fake_height
+        if screen is self.fake_screen:
+            self.scaling = "none"
+        elif (window_width, window_height) == (fake_width, fake_height):
+            self.scaling = "copy"
+        elif self.scale_x == self.scale_y and self.scale_x.is_integer():
+            # Scaled like "stretch" (transform.scale is also the fastest scaler for integer factors),
+            # but dirty rectangles are scaled to exact window rectangles, without a rounding margin
+            self.scaling = "integer"
+        else:
+            self.scaling = "stretch"
+        return
+
+    def invalidate(self):
+        # The next frame is presented whole
+        self.full_update_needed = True
+        return
+
+    def present(self, dirty_rects=None):
+        # dirty_rects are the changed parts of the fake screen, None when everything may have changed
+        start = time.perf_counter()
+        fake_rect = self.fake_screen.get_rect()
+        if dirty_rects is not None and DIRTY_RECT_PRESENTATION and not self.full_update_needed:
+            dirty_area = 0
+            for rect in dirty_rects:
+                dirty_area += rect.width * rect.height
+            if dirty_area <= DIRTY_RECT_MAX_AREA_RATIO * fake_rect.width * fake_rect.height:
+                self.present_rects(dirty_rects)
+                self.present_time = (time.perf_counter() - start) * 1000
+                return
+        if self.scaling == "copy":
+            self.screen.blit(self.fake_screen, (0, 0))
+        elif self.scaling != "none":
+            self.scale_into_window(fake_rect, self.screen.get_rect())
+        pygame.display.flip()
+        self.full_update_needed = False
+        self.pixels_presented = self.screen.get_width() * self.screen.get_height()
+        self.full_updates += 1
+        self.present_time = (time.perf_counter() - start) * 1000
+        return
+
+    def scale_into_window(self, rect, window_rect):
+        if self.screen.get_bitsize() == self.fake_screen.get_bitsize():
+            pygame.transform.scale(self.fake_screen.subsurface(rect), window_rect.size, self.screen.subsurface(window_rect))
+        else:
+            # The window format is different, so the scaled frame has to be converted by a blit
+            self.screen.blit(pygame.transform.scale(self.fake_screen.subsurface(rect), window_rect.size), window_rect)
+            self.allocations += 1
+        return
+
+    def present_rects(self, dirty_rects):
+        fake_rect = self.fake_screen.get_rect()
+        window = self.screen.get_rect()
+        window_rects = []
+        self.pixels_presented = 0
+        margin = 0 if self.scaling in ("none", "copy", "integer") else DIRTY_RECT_MARGIN
+        for rect in dirty_rects:
+            # A small margin hides the rounding of the scaled rectangles
+            rect = rect.inflate(margin * 2, margin * 2).clip(fake_rect)
+            if not rect.width or not rect.height:
+                continue
+            # Integer math, the right and bottom edges are rounded up but never past the window
+            left = rect.left * window.width // fake_rect.width
+            top = rect.top * window.height // fake_rect.height
+            right = -(-rect.right * window.width // fake_rect.width)
+            bottom = -(-rect.bottom * window.height // fake_rect.height)
+            window_rect = pygame.Rect(left, top, right - left, bottom - top).clip(window)
+            if self.scaling == "copy":
+                self.screen.blit(self.fake_screen, window_rect, rect)
+            elif self.scaling != "none":
+                self.scale_into_window(rect, window_rect)
+            window_rects.append(window_rect)
+            self.pixels_presented += window_rect.width * window_rect.height
+        pygame.display.update(window_rects)
+        self.partial_updates += 1
+        return
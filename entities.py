@@ -0,0 +1,151 @@
+# Storage of the game objects
+from parameters import *
+from collisions import SpatialHash
+
+
+class EntityList:
+    # Entities in a contiguous list, with the index of each one. An entity is removed in constant time
+    # by moving the last entity to its slot, so the order of the entities is not kept.
+    def __init__(self, entities=()):
+        self.entities = []
+        self.indices = {}
+        for entity in entities:
+            self.append(entity)
+        return
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, entity):
+        return entity in self.indices
+
+    def append(self, entity):
+        self.indices[entity] = len(self.entities)
+        self.entities.append(entity)
+        return
+
+    def remove(self, entity):
+        # False when the entity is not in the list
+        index = self.indices.pop(entity, None)
+        if index is None:
+            return False
+        last = self.entities.pop()
+        if last is not entity:
+            self.entities[index] = last
+            self.indices[last] = index
+        return True
+
+
+class DrawList:
+    # Entities in their drawing order. A removed entity leaves a hole in its slot, found with the index of each entity,
+    # so a removal costs the same whatever the number of entities. The holes are skipped by the iteration
+    # and the list is compacted, keeping the order of the others, only once half of its slots are holes:
+    # a compaction moves at most twice as many entities as the removals since the previous one.
+    def __init__(self):
+        self.entities = []
+        self.indices = {}
+        self.removed = {}       # Index of the hole left by each entity removed since the last compaction
+        self.holes = 0
+        return
+
+    def __iter__(self):
+        if not self.holes:
+            return iter(self.entities)
+        return (entity for entity in self.entities if entity is not None)
+
+    def __len__(self):
+        return len(self.entities) - self.holes
+
+    def append(self, entity):
+        index = self.removed.pop(entity, None)
+        if index is None:
+            self.indices[entity] = len(self.entities)
+            self.entities.append(entity)
+        else:
+            # Removed and added again before a compaction, it takes its place back
+            self.entities[index] = entity
+            self.indices[entity] = index
+            self.holes -= 1
+        return
+
+    def remove(self, entity):
+        # False when the entity is not in the list
+        index = self.indices.pop(entity, None)
+        if index is None:
+            return False
+        self.entities[index] = None
+        self.removed[entity] = index
+        self.holes += 1
+        return True
+
+    def compact(self):
+        if self.holes and self.holes * 2 >= len(self.entities):
+            self.entities = [entity for entity in self.entities if entity is not None]
+            self.indices = {entity: index for index, entity in enumerate(self.entities)}
+            self.removed.clear()
+            self.holes = 0
+        return
+
+
+class DrawLayers:
+    # Draw lists of the layers (see the DRAWING LAYERS parameters), iterated from the bottom layer to the top one
+    def __init__(self, number=DRAWING_LAYERS):
+        self.layers = tuple(DrawList() for layer in range(number))
+        return
+
+    def __getitem__(self, layer):
+        return self.layers[layer]
+
+    def __iter__(self):
+        for layer in self.layers:
+            yield from layer
+        return
+
+    def __len__(self):
+        return sum(len(layer) for layer in self.layers)
+
+    def compact(self):
+        for layer in self.layers:
+            layer.compact()
+        return
+
+
+class SleepScheduler:
+    # Entities far from the screen sleep: they are taken out of their draw list, so they are neither updated nor drawn,
+    # and they are indexed in a grid, so only the sleeping entities near the screen are looked at to wake them.
+    # The cost of a step depends on the entities around the screen and not on the size of the world.
+    # Sleeping entities must not move, wake() catches their timers up with the game time that has passed.
+    def __init__(self, entities, assets, margin=SLEEP_MARGIN):
+        self.assets = assets
+        self.margin = margin
+        self.awake = EntityList()
+        self.sleeping = SpatialHash()
+        self.asleep = 0
+        for entity in entities:
+            self.sleeping.insert(entity)
+            self.asleep += 1
+        return
+
+    def schedule(self, camera):
+        area = camera.inflate(2 * self.margin, 2 * self.margin)
+        for entity in self.sleeping.query(area):
+            self.sleeping.remove(entity)
+            self.asleep -= 1
+            entity.wake()
+            self.awake.append(entity)
+            self.assets.append(entity)
+        for entity in list(self.awake):
+            if not area.colliderect(entity.rect):
+                self.awake.remove(entity)
+                self.assets.remove(entity)
+                self.sleeping.insert(entity)
+                self.asleep += 1
+        return
+
+    def remove(self, entity):
+        # Called when the entity dies, only awake entities are near enough to the player to die
+        self.awake.remove(entity)
+        return
@@ -0,0 +1,32 @@
+# Game time and input shared by every asset
+import pygame
+
+
+class FrameContext:
+    # Time and input are sampled once by the game loop and read by every asset, instead of each asset asking SDL.
+    # The game time advances only with the simulation steps, so it stops while the game is paused
+    # and it is the same for every object updated in a step.
+    def __init__(self):
+        self.time = 0   # ms of game time
+        self.dt = 0     # ms of the current simulation step
+        self.keys = None
+        return
+
+    def reset(self):
+        # Every world starts at game time 0
+        self.time = 0
+        self.dt = 0
+        return
+
+    def sample_input(self):
+        # Once per frame, every simulation step of the frame reads the same keys
+        self.keys = pygame.key.get_pressed()
+        return
+
+    def step(self, dt):
+        self.dt = dt
+        self.time += dt
+        return
+
+
+frame_context = FrameContext()
@@ -1,6 +1,12 @@
 from assets import *
 from pygame.locals import *
-from pygame import mixer
+from resources import WorldPrefetcher, MusicStream, prepare_surface, frame_cache, text_cache
+from display import Presenter, create_window
+from frame_context import frame_context
+from animation import animation_clock
+from sounds import SoundDispatcher
+from collisions import CollisionGroup, swept_hit
+from entities import EntityList, DrawLayers, SleepScheduler
 
 
 class Game:
@@ -8,76 +14,135 @@ class Game:
         pygame.init()
         pygame.mixer.init()
         self.load_sounds()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), HWSURFACE | DOUBLEBUF | RESIZABLE)
-        self.fake_screen = self.screen.copy()
+        self.screen = create_window((WIDTH, HEIGHT))
+        if WINDOW_SCALING == "display":
+            self.fake_screen = self.screen
+        else:
+            self.fake_screen = self.screen.copy()
+        self.presenter = Presenter(self.screen, self.fake_screen)
         pygame.display.set_caption(TITLE)
+        if USE_ATLAS:
+            frame_cache.load_atlas(ATLAS_IMAGE, ATLAS_INDEX)
         self.clock = pygame.time.Clock()
         self.running = True
         self.playing = True
         self.game_app_runs = True
         self.exit = False
         self.last_loading_screen_time = pygame.time.get_ticks()
+        self.world_prefetcher = WorldPrefetcher(WORLD_PREFETCH_MEMORY_BUDGET)
+        # Projectile records are created once for the whole game
+        self.fireball_pool = ProjectilePool(FIREBALL_POOL_SIZE, lambda: Fireball(pygame.Rect(0, 0, 0, 0), True))
+        self.enemy_fire_pool = ProjectilePool(ENEMY_FIRE_POOL_SIZE, lambda: Enemy_Fireball(0, 0, 0, 0))
         self.player_coins = 0
         self.player_lives = INITIAL_PLAYER_LIVES
+        self.show_debug_overlay = SHOW_DEBUG_OVERLAY
+        self.drawn_objects = 0
+        self.culled_objects = 0
         return
 
     def new(self, world_number):
-        # Loading screen for smoothness
-        self.loading_screen()
+        # Loading screen for smoothness, shown while the world is decoded if it has not been prefetched
+        if not self.world_prefetcher.is_ready(world_number):
+            self.world_prefetcher.prefetch(world_number)
+            self.loading_screen()
+        self.world_resources = self.world_prefetcher.get(world_number)
 
-        # Playing music
-        self.world_music = mixer.Sound(WORLD_MUSIC_DIRECTORY[world_number-1])
-        self.world_music.play(-1)
+        # Playing music, from where it was stopped if the world is played again
+        self.music.play(WORLD_MUSIC_DIRECTORY[world_number-1])
 
         # Loading world objects
         self.load_world_objects(world_number)
+        if ENEMY_FIRE_PRELOAD_ROTATIONS and self.ENEMY_LIST:
+            preload_enemy_fire_rotations()
 
-        # Creating Assets
-        self.assets = []
+        # The game time starts again with every world, before its objects are created
+        frame_context.reset()
+        animation_clock.tick(frame_context.time)
 
-        self.background = WorldBackground(self.world_number, self.WORLD_BACKGROUND)
-        self.assets.append(self.background)
+        # Camera, the part of the world shown on the screen
+        self.camera = pygame.Rect(-WORLD_INITIAL_X_DIRECTORY[self.world_number-1], -WORLD_INITIAL_Y_DIRECTORY[self.world_number-1], WIDTH, HEIGHT)
+        self.last_camera = self.camera.copy()
+        self.last_drawn_camera = None
 
-        self.world = World(self.world_number, self.WORLD_TILES, True, WHITE)
-        self.assets.append(self.world)
+        # Creating Assets
+        # All the assets are placed in world coordinates, the camera is applied only when they are drawn
+        # Static assets never move, so they are drawn but not updated
+        # The other assets are in entity lists, where the dead ones are removed together once per step,
+        # and they are drawn in the order of their layer
+        self.static_assets = []
+        self.assets = DrawLayers()
+        self.deaths = []
 
-        self.door = Door(*self.DOOR)
-        self.assets.append(self.door)
+        self.background = WorldBackground(self.world_number, self.world_resources.backgrounds)
+        self.static_assets.append(self.background)
 
-        self.player = Player(self.world_number)
-        self.assets.append(self.player)
-        self.player.coins_collected = self.player_coins
+        self.world = World(self.world_number, self.world_resources.tiles)
+        self.static_assets.append(self.world)
 
-        self.player_miscbar = MiscBar(self.player)
-        self.assets.append(self.player_miscbar)
+        self.door = Door(*self.DOOR)
+        self.static_assets.append(self.door)
 
         self.platforms = []
         for plat in self.PLATFORM_LIST:
             platform = Platform(*plat)
             self.platforms.append(platform)
-            self.assets.append(platform)
+            self.static_assets.append(platform)
 
-        self.coins = []
+        self.player = Player(self.world_number)
+        self.assets[PLAYER_LAYER].append(self.player)
+        self.player.coins_collected = self.player_coins
+
+        # The miscbar is drawn on the screen over the world
+        self.player_miscbar = MiscBar(self.player)
+
+        self.coins = EntityList()
         for coin in self.COIN_LIST:
             c = Coin(*coin)
             self.coins.append(c)
-            self.assets.append(c)
 
-        self.enemies = []
+        self.enemies = EntityList()
         for enemy_pos in self.ENEMY_LIST:
             enemy = Enemy(*enemy_pos)
-            self.assets.append(enemy)
             self.enemies.append(enemy)
 
-        # Empty list for fireballs storage
-        self.fireballs = []
-        self.fireball_trigger_time = pygame.time.get_ticks()
+        # Coins and enemies start asleep, the ones around the screen are woken now
+        self.coin_scheduler = SleepScheduler(self.coins, self.assets[COIN_LAYER])
+        self.enemy_scheduler = SleepScheduler(self.enemies, self.assets[ENEMY_LAYER])
+        self.coin_scheduler.schedule(self.camera)
+        self.enemy_scheduler.schedule(self.camera)
+        self.assets.compact()
+
+        # Empty list for fireballs storage, the projectiles of the last world go back to their pools
+        self.fireball_pool.release_all()
+        self.enemy_fire_pool.release_all()
+        self.fireballs = EntityList()
+        self.fireball_trigger_time = frame_context.time
 
         # Empty list for enemy fire storage
-        self.enemy_fire = []
+        self.enemy_fire = EntityList()
 
         # Empty list for explosion objects
-        self.explosions = []
+        self.explosions = EntityList()
+
+        # Collision groups, the platforms, coins and enemies never move and are indexed once,
+        # the player and the projectiles are indexed again in every step
+        self.player_group = CollisionGroup([self.player])
+        self.platforms_group = CollisionGroup(self.platforms)
+        self.coins_group = CollisionGroup(self.coins.entities)
+        self.enemies_group = CollisionGroup(self.enemies.entities)
+        self.fireballs_group = CollisionGroup(self.fireballs.entities)
+        self.enemy_fire_group = CollisionGroup(self.enemy_fire.entities)
+
+        # Despawn rules of the projectiles: (projectiles, max age in ms, margin out of the screen in pixels)
+        self.lifetime_rules = ((self.fireballs, FIREBALL_MAX_AGE, FIREBALL_OFFSCREEN_MARGIN),
+                               (self.enemy_fire, ENEMY_FIRE_MAX_AGE, ENEMY_FIRE_OFFSCREEN_MARGIN))
+
+        self.last_drawn_rects = []
+        self.presenter.invalidate()
+
+        # The next world is decoded in the background while this one is played
+        if self.world_number < NUMBER_OF_WORLDS:
+            self.world_prefetcher.prefetch(self.world_number + 1)
 
         self.run()
         passed = False
@@ -86,13 +151,11 @@ class Game:
             self.player_coins = self.player.coins_collected
 
         self.last_loading_screen_time = pygame.time.get_ticks()
-        self.world_music.stop()
+        self.music.stop()
         return passed
 
     def load_world_objects(self, world_number):
         self.world_number = world_number
-        self.WORLD_TILES = WORLD_TILES_DIRECTORY[self.world_number-1]
-        self.WORLD_BACKGROUND = WORLD_BACKGROUND_DIRECTORY[self.world_number-1]
         self.PLATFORM_LIST = WORLD_PLATFORM_LIST_DIRECTORY[self.world_number-1]
         self.COIN_LIST = WORLD_COIN_LIST_DIRECTORY[self.world_number-1]
         self.ENEMY_LIST = WORLD_ENEMY_LIST_DIRECTORY[self.world_number-1]
@@ -103,11 +166,26 @@ class Game:
 
     def run(self):
         # Game Loop
+        # The simulation advances in fixed steps of SIMULATION_STEP ms, whatever the frame rate,
+        # and every frame is drawn between the last two steps
+        self.accumulator = 0
+        self.simulation_steps = 0
+        self.clock.tick(FPS)
         while self.playing:
-            self.clock.tick(FPS)
+            self.accumulator += self.clock.tick(FPS)
+            frame_context.sample_input()
             self.events()
-            self.update()
-            self.draw()
+            self.simulation_steps = 0
+            while self.accumulator >= SIMULATION_STEP and self.playing:
+                if self.simulation_steps == MAX_SIMULATION_STEPS_PER_FRAME:
+                    # Spiral of death guard: the remaining time is dropped instead of being simulated
+                    self.accumulator = 0
+                    break
+                frame_context.step(SIMULATION_STEP)
+                self.update()
+                self.accumulator -= SIMULATION_STEP
+                self.simulation_steps += 1
+            self.draw(self.accumulator / SIMULATION_STEP)
 
             if self.player.life <= 0 or self.door.opened:
                 self.playing = False
@@ -130,24 +208,31 @@ class Game:
                     if self.player.can_jump:
                         self.jump_sound.play()
                 if event.key == pygame.K_RETURN:
-                    now = pygame.time.get_ticks()
+                    now = frame_context.time
                     if now - self.fireball_trigger_time > FIREBALL_SPAWN_TIME_INTERVAL:
-                        self.fireball_trigger_time = now
-                        fireball = Fireball(self.player.rect, self.player.direction_right)
-                        self.assets.append(fireball)
-                        self.fireballs.append(fireball)
-                        self.fire_sound.play()
+                        fireball = self.fireball_pool.spawn(self.player.rect, self.player.direction_right)
+                        if fireball is not None:
+                            self.fireball_trigger_time = now
+                            self.assets[EFFECT_LAYER].append(fireball)
+                            self.fireballs.append(fireball)
+                            self.fire_sound.play()
                 if event.key == pygame.K_ESCAPE:
-                    self.pause_time = pygame.time.get_ticks()
                     self.pause()
-            if event.type == VIDEORESIZE:
-                self.screen = pygame.display.set_mode(event.size, HWSURFACE | DOUBLEBUF | RESIZABLE)
+                if event.key == pygame.K_F3:
+                    self.show_debug_overlay = not self.show_debug_overlay
+            if event.type == VIDEORESIZE and WINDOW_SCALING != "display":
+                self.screen = create_window(event.size)
+                self.presenter.resize(self.screen)
         return
 
     def pause(self):
         self.paused = True
         self.pause_sound.play()
-        self.world_music.stop()
+        self.music.pause()
+        # Pause text
+        text = text_cache.render(PAUSE_TITLE_TITLE, PAUSE_TITLE_SIZE, PAUSE_TITLE_COLOR)
+        self.fake_screen.blit(text, (PAUSE_TITLE_POS_X, PAUSE_TITLE_POS_Y))
+        self.presenter.invalidate()
         while self.paused:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -160,87 +245,105 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.pause_sound.play()
-                        self.world_music.play(-1)
+                        self.music.resume()
                         self.paused = False
-                        self.pause_time = pygame.time.get_ticks() - self.pause_time
-                        self.player.pass_pause_time(self.pause_time)
-                        for fireball in self.fireballs:
-                            fireball.pass_pause_time(self.pause_time)
-                        for fire in self.enemy_fire:
-                            fire.pass_pause_time(self.pause_time)
-                        for enemy in self.enemies:
-                            enemy.pass_pause_time(self.pause_time)
-            # Pause text
-            font = pygame.font.Font(GAME_FONT, PAUSE_TITLE_SIZE)
-            text = font.render(PAUSE_TITLE_TITLE, True, PAUSE_TITLE_COLOR)
-            self.screen.blit(text, (PAUSE_TITLE_POS_X, PAUSE_TITLE_POS_Y))
-            pygame.display.flip()
+            self.presenter.present([])
+        # The game is drawn whole again after the pause text
+        self.presenter.invalidate()
+        # The pause is not simulated, so the game time stops during it
+        self.clock.tick(FPS)
         return
 
     def update(self):
-        # Camera Movement
-        self.scrolling_camera()
-        # Game Loop - Update
+        # Game Loop - Update, one simulation step of the frame context
+        dt = frame_context.dt
+        animation_clock.tick(frame_context.time)
+        self.last_camera = self.camera.copy()
         for asset in self.assets:
-            asset.update(self.dx, self.dy)
+            asset.update(dt)
+            # Splashes and explosions die at the end of their animation
+            if asset.kill:
+                self.deaths.append(asset)
+        self.player_miscbar.update()
         # Enemies fire management:
-        for enemy in self.enemies:
-            if enemy.active():
+        for enemy in self.enemy_scheduler.awake:
+            if enemy.active(self.camera):
                 if enemy.generate_fire():
                     # creates enemy fire object
-                    enemy_fire = Enemy_Fireball(enemy.rect.centerx, enemy.rect.centery, self.player.rect.centerx, self.player.rect.centery)
-                    self.enemy_fire.append(enemy_fire)
-                    self.assets.append(enemy_fire)
-                    self.fire_sound.play()
+                    enemy_fire = self.enemy_fire_pool.spawn(enemy.rect.centerx, enemy.rect.centery, self.player.rect.centerx, self.player.rect.centery)
+                    if enemy_fire is not None:
+                        self.enemy_fire.append(enemy_fire)
+                        self.assets[EFFECT_LAYER].append(enemy_fire)
+                        self.fire_sound.play()
         # Collision detection
         self.collision_manager()
+        # Despawn of the projectiles
+        self.lifetime_manager()
         # Delete dead objects
         self.objects_kill_manager()
         # Pass values to Assets
         self.player.world = self.world_number
         self.player.lives = self.player_lives
         self.player_miscbar.pass_values(self.player)
-        for enemy in self.enemies:
+        for enemy in self.enemy_scheduler.awake:
             enemy.pass_values(self.player.rect.x, self.player.rect.y)
+        # Camera Movement
+        self.scrolling_camera()
+        # Coins and enemies sleep far from the screen
+        self.coin_scheduler.schedule(self.camera)
+        self.enemy_scheduler.schedule(self.camera)
+        # The draw lists are compacted once, keeping the drawing order
+        self.assets.compact()
         return
 
     def scrolling_camera(self):
         self.dx = 0
         self.dy = 0
+        # Player's position on the screen
+        screen_x = self.player.rect.x - self.camera.x
+        screen_y = self.player.rect.y - self.camera.y
 
         # Moving Right
-        if self.player.rect.x + PLAYER_WIDTH > WIDTH - CAMERA_SCROLL_GAP_X:
-            if self.player.abs_pos_x + PLAYER_WIDTH < self.WORLD_WIDTH - CAMERA_SCROLL_GAP_X:
-                self.dx = self.player.rect.x + PLAYER_WIDTH - (WIDTH - CAMERA_SCROLL_GAP_X)
+        if screen_x + PLAYER_WIDTH > WIDTH - CAMERA_SCROLL_GAP_X:
+            if self.player.rect.x + PLAYER_WIDTH < self.WORLD_WIDTH - CAMERA_SCROLL_GAP_X:
+                self.dx = screen_x + PLAYER_WIDTH - (WIDTH - CAMERA_SCROLL_GAP_X)
             else:
-                if self.player.abs_pos_x + PLAYER_WIDTH >= self.WORLD_WIDTH:
-                    self.player.rect.x = WIDTH - PLAYER_WIDTH
-                    self.player.abs_pos_x = self.WORLD_WIDTH - PLAYER_WIDTH
+                if self.player.rect.x + PLAYER_WIDTH >= self.WORLD_WIDTH:
+                    self.player.rect.x = self.WORLD_WIDTH - PLAYER_WIDTH
 
         # Moving Left
-        if self.player.rect.x < CAMERA_SCROLL_GAP_X:
-            if self.player.abs_pos_x > CAMERA_SCROLL_GAP_X:
-                self.dx = self.player.rect.x - CAMERA_SCROLL_GAP_X
+        if screen_x < CAMERA_SCROLL_GAP_X:
+            if self.player.rect.x > CAMERA_SCROLL_GAP_X:
+                self.dx = screen_x - CAMERA_SCROLL_GAP_X
             else:
                 if self.player.rect.x < 0:
                     self.player.rect.x = 0
-                    self.player.abs_pos_x = 0
 
         # Moving Up
-        if self.player.rect.y < CAMERA_SCROLL_GAP_Y:
-            self.dy = self.player.rect.y - CAMERA_SCROLL_GAP_Y
+        if screen_y < CAMERA_SCROLL_GAP_Y:
+            self.dy = screen_y - CAMERA_SCROLL_GAP_Y
 
         # Moving Down
-        if self.player.rect.y + PLAYER_HEIGHT > HEIGHT - CAMERA_SCROLL_GAP_Y:
-            if self.player.abs_pos_y + PLAYER_HEIGHT < self.WORLD_HEIGHT - CAMERA_SCROLL_GAP_Y:
-                self.dy = self.player.rect.y + PLAYER_HEIGHT - (HEIGHT - CAMERA_SCROLL_GAP_Y)
+        if screen_y + PLAYER_HEIGHT > HEIGHT - CAMERA_SCROLL_GAP_Y:
+            if self.player.rect.y + PLAYER_HEIGHT < self.WORLD_HEIGHT - CAMERA_SCROLL_GAP_Y:
+                self.dy = screen_y + PLAYER_HEIGHT - (HEIGHT - CAMERA_SCROLL_GAP_Y)
+
+        self.camera.x += self.dx
+        self.camera.y += self.dy
         return
 
     def collision_manager(self):
+        # The collision groups give the pairs of colliding objects (see CollisionGroup)
+        self.fireballs_group.update()
+        self.enemy_fire_group.update()
+
         # Collisions between player and platforms
         self.player.can_jump = False
         gap = COLLISION_GAP
-        for platform in self.platforms:
+        self.sweep_player(gap)
+        self.player_group.update()
+        for player, platform in self.player_group.hits(self.platforms_group):
+            # The player may have been moved by a previous platform
             if self.player.rect.colliderect(platform.rect):
                 if platform.rect.left + gap < self.player.rect.right and platform.rect.right - gap > self.player.rect.left:
                     if self.player.vel_y > 0:
@@ -248,7 +351,7 @@ class Game:
                         self.player.rect.y = platform.rect.top - PLAYER_HEIGHT + 1
                         if self.player.jumping:
                             splash = Splash(self.player.rect)
-                            self.assets.append(splash)
+                            self.assets[EFFECT_LAYER].append(splash)
                         self.player.jumping = False
                         self.player.can_jump = True
                     elif self.player.vel_y < 0:
@@ -269,120 +372,229 @@ class Game:
                             self.player.rect.x = platform.rect.left - PLAYER_WIDTH
 
         # Collisions between player and coins
-        for coin in self.coins:
-            if self.player.rect.colliderect(coin.rect):
-                coin.kill = True
-                self.coins.remove(coin)
-                self.player.coins_collected += 1
-                self.coin_sound.play()
+        self.player_group.update()
+        for player, coin in self.player_group.hits(self.coins_group):
+            self.kill(coin)
+            self.player.coins_collected += 1
+            self.coin_sound.play()
 
         # Collisions between player and door
         if self.player.rect.colliderect(self.door.rect):
             self.door.check_if_door_is_open()
 
-        # Collisions between fireballs and platforms
+        # Collisions between fireballs and platforms, along the whole move of the step for a fireball that has passed through a platform
+        for fireball, platform in self.fireballs_group.hits(self.platforms_group):
+            self.kill(fireball)
         for fireball in self.fireballs:
-            for platform in self.platforms:
-                if fireball.rect.colliderect(platform):
-                    fireball.kill = True
-
-        # collision between fireballs and enemies:
+            start = fireball.last_rect
+            if not fireball.kill and self.platforms_group.sweep(start, fireball.rect.x - start.x, fireball.rect.y - start.y):
+                self.kill(fireball)
+
+        # collision between fireballs and enemies, along the whole move of the step for a fireball that has passed through an enemy:
+        for fireball, enemy in self.fireballs_group.hits(self.enemies_group):
+            if enemy.active(self.camera):
+                self.fireball_hits_enemy(fireball, enemy)
         for fireball in self.fireballs:
-            for enemy in self.enemies:
-                if enemy.active():
-                    if fireball.rect.colliderect(enemy):
-                        fireball.kill = True
-                        enemy.damage()
-                        self.hit_sound.play()
-                        if enemy.life <= 0:
-                            enemy.kill = True
+            if not fireball.kill:
+                start = fireball.last_rect
+                hit = self.enemies_group.sweep(start, fireball.rect.x - start.x, fireball.rect.y - start.y)
+                if hit is not None and hit[3].active(self.camera):
+                    self.fireball_hits_enemy(fireball, hit[3])
 
         # collision between player and enemies:
-        for enemy in self.enemies:
+        self.player_group.update()
+        for player, enemy in self.player_group.hits(self.enemies_group):
             if self.player.rect.colliderect(enemy.rect):
                 if self.player.rect.x <= enemy.rect.centerx:
                     self.player.rect.x -= PLAYER_COLLISION_WITH_ENEMY_REPOSITION_OFFSET
-                    self.player.abs_pos_x -= PLAYER_COLLISION_WITH_ENEMY_REPOSITION_OFFSET
                 else:
                     self.player.rect.x += PLAYER_COLLISION_WITH_ENEMY_REPOSITION_OFFSET
-                    self.player.abs_pos_x += PLAYER_COLLISION_WITH_ENEMY_REPOSITION_OFFSET
                 self.player.life -= PLAYER_HIT_BY_ENEMY_DAMAGE
                 self.hit_sound.play()
 
-        # collision between player and enemy fire:
+        # collision between player and enemy fire, along the moves of the step of both for a fire that has passed through the player:
+        self.player_group.update()
+        for player, fire in self.player_group.hits(self.enemy_fire_group):
+            self.fire_hits_player(fire)
         for fire in self.enemy_fire:
-            if self.player.rect.colliderect(fire.rect):
-                self.player.life -= PLAYER_HIT_BY_ENEMY_DAMAGE
-                fire.kill = True
-                self.hit_sound.play()
+            if not fire.kill and swept_hit(fire, self.player) is not None:
+                self.fire_hits_player(fire)
 
         # collision between player's fireballs and enemy's fire
-        for fire in self.enemy_fire:
-            for fireball in self.fireballs:
-                if fire.rect.colliderect(fireball.rect):
-                    fire.kill = True
-                    fireball.kill = True
-                    explosion = Explosion(fireball.rect)
-                    self.explosions.append(explosion)
-                    self.assets.append(explosion)
-                    self.explosion_sound.play()
+        for fire, fireball in self.enemy_fire_group.hits(self.fireballs_group):
+            self.kill(fire)
+            self.kill(fireball)
+            explosion = Explosion(fireball.rect)
+            self.explosions.append(explosion)
+            self.assets[EFFECT_LAYER].append(explosion)
+            self.explosion_sound.play()
 
         # Checks if player has fallen out of the world
-        if self.player.abs_pos_y > self.WORLD_HEIGHT + 1:
+        if self.player.rect.y > self.WORLD_HEIGHT + 1:
             self.player.life = 0
         return
 
+    def fireball_hits_enemy(self, fireball, enemy):
+        self.kill(fireball)
+        enemy.damage()
+        self.hit_sound.play()
+        if enemy.life <= 0:
+            self.kill(enemy)
+        return
+
+    def fire_hits_player(self, fire):
+        self.player.life -= PLAYER_HIT_BY_ENEMY_DAMAGE
+        self.kill(fire)
+        self.hit_sound.play()
+        return
+
+    def sweep_player(self, gap):
+        # Swept test of the move of the player in the step against the platforms: a long step cannot take the player
+        # through a platform. The player is stopped on the first face hit and slides along it on the other axis,
+        # the contact is then resolved by the discrete test.
+        start = self.player.last_rect
+        hit = self.platforms_group.sweep(start, self.player.rect.x - start.x, self.player.rect.y - start.y)
+        if hit is None:
+            return
+        time, normal_x, normal_y, platform = hit
+        if normal_y:
+            # Like the discrete test, a platform touched by less than the gap is a wall
+            if platform.rect.left + gap >= self.player.rect.right or platform.rect.right - gap <= self.player.rect.left:
+                return
+            if normal_y < 0:
+                # Overlaps the top of the platform by 1 pixel, like a landing of the discrete test
+                self.player.rect.y = platform.rect.top - PLAYER_HEIGHT + 1
+            else:
+                self.player.rect.y = platform.rect.bottom
+                self.player.vel_y = 0
+        else:
+            self.player.vel_x = 0
+            if normal_x > 0:
+                self.player.rect.x = platform.rect.right
+            else:
+                self.player.rect.x = platform.rect.left - PLAYER_WIDTH
+        return
+
+    def lifetime_manager(self):
+        # Projectiles despawn when they leave the world, when they are older than their max age
+        # or when they are further out of the screen than their margin, so their records go back to the pools
+        for projectiles, max_age, margin in self.lifetime_rules:
+            if margin is None:
+                area = self.world.rect
+            else:
+                area = self.camera.inflate(2 * margin, 2 * margin).clip(self.world.rect)
+            for projectile in projectiles:
+                if not area.colliderect(projectile.rect):
+                    self.kill(projectile)
+                elif max_age is not None and frame_context.time - projectile.spawn_time > max_age:
+                    self.kill(projectile)
+        return
+
+    def kill(self, entity):
+        # The entity is removed from its lists at the end of the step (see objects_kill_manager)
+        if not entity.kill:
+            entity.kill = True
+            self.deaths.append(entity)
+        return
+
     def objects_kill_manager(self):
-        for asset in self.assets:
-            if asset.kill:
-                self.assets.remove(asset)
-        for fireball in self.fireballs:
-            if fireball.kill:
-                self.fireballs.remove(fireball)
-        for enemy in self.enemies:
-            if enemy.kill:
-                self.enemies.remove(enemy)
-        for fire in self.enemy_fire:
-            if fire.kill:
-                self.enemy_fire.remove(fire)
+        # Dead objects are removed together once per step, in a time proportional to their number
+        for entity in self.deaths:
+            if self.enemies.remove(entity):
+                self.assets[ENEMY_LAYER].remove(entity)
+                self.enemies_group.remove(entity)
+                self.enemy_scheduler.remove(entity)
+            elif self.coins.remove(entity):
+                self.assets[COIN_LAYER].remove(entity)
+                self.coins_group.remove(entity)
+                self.coin_scheduler.remove(entity)
+            else:
+                self.assets[EFFECT_LAYER].remove(entity)
+                if self.fireballs.remove(entity):
+                    self.fireball_pool.release(entity)
+                elif self.enemy_fire.remove(entity):
+                    self.enemy_fire_pool.release(entity)
+                else:
+                    self.explosions.remove(entity)
+        self.deaths.clear()
         return
 
-    def draw(self):
+    def draw(self, alpha):
         # Game Loop - Draw
-        # Draw / render
+        # Draw / render, alpha is the part of the simulation step elapsed since the last one
+        camera = interpolate(self.last_camera, self.camera, alpha)
+        # Objects outside the camera are culled
+        self.drawn_objects = 0
+        self.culled_objects = 0
+        for asset in self.static_assets:
+            if camera.colliderect(asset.rect):
+                asset.draw(self.fake_screen, camera)
+                self.drawn_objects += 1
+            else:
+                self.culled_objects += 1
+        drawn_rects = []
         for asset in self.assets:
-            asset.draw(self.fake_screen)
-        self.screen.blit(pygame.transform.scale(self.fake_screen, self.screen.get_rect().size), (0, 0))
-        # *after* drawing everything, flip the display
-        pygame.display.flip()
+            if camera.colliderect(asset.rect):
+                drawn_rects.append(asset.draw(self.fake_screen, camera, alpha))
+                self.drawn_objects += 1
+            else:
+                self.culled_objects += 1
+        self.player_miscbar.draw(self.fake_screen)
+        drawn_rects.append(self.player_miscbar.rect)
+        if self.show_debug_overlay:
+            self.draw_debug_overlay()
+            drawn_rects.append(self.debug_overlay_rect)
+        # Only the moving and animated objects change while the camera is still, the whole screen changes when it scrolls
+        if camera != self.last_drawn_camera:
+            self.presenter.present()
+        else:
+            self.presenter.present(self.last_drawn_rects + drawn_rects)
+        self.last_drawn_rects = drawn_rects
+        self.last_drawn_camera = camera
+        return
+
+    def draw_debug_overlay(self):
+        lines = (f"STEPS {self.simulation_steps}  DRAWN {self.drawn_objects}  CULLED {self.culled_objects}  PIXELS {self.presenter.pixels_presented}  PRESENT {self.presenter.present_time:.2f} MS",
+                 # Live entities, bounded by the despawn rules of the projectiles
+                 f"ENTITIES {len(self.assets)}  FIREBALLS {len(self.fireballs)}  ENEMY FIRE {len(self.enemy_fire)}  ASLEEP {self.coin_scheduler.asleep + self.enemy_scheduler.asleep}",
+                 self.sounds.report(),
+                 self.world.chunks.report(),
+                 frame_cache.report(),
+                 self.player_miscbar.report())
+        self.debug_overlay_rect = pygame.Rect(DEBUG_OVERLAY_POS_X, DEBUG_OVERLAY_POS_Y, 0, 0)
+        for line in lines:
+            text = text_cache.render(line, DEBUG_OVERLAY_FONT_SIZE, DEBUG_OVERLAY_COLOR)
+            self.debug_overlay_rect.union_ip(self.fake_screen.blit(text, (DEBUG_OVERLAY_POS_X, self.debug_overlay_rect.bottom)))
         return
 
     def start_screen(self):
         self.menu_sound.play(-1)
         waiting = True
         selected_option = 0
+        image = prepare_surface(pygame.image.load(MENU_BACKGROUND), MENU_BACKGROUND_SURFACE_FORMAT)
+        option_changed = False
+        self.presenter.invalidate()
         while waiting:
-            image = pygame.image.load(MENU_BACKGROUND)
             self.fake_screen.blit(image, (0, 0))
             # Menu Text
-            font = pygame.font.Font(GAME_FONT, MENU_TITLE_SIZE)
-            text = font.render(MENU_TITLE_TITLE, True, MENU_TITLE_COLOR)
+            text = text_cache.render(MENU_TITLE_TITLE, MENU_TITLE_SIZE, MENU_TITLE_COLOR)
             self.fake_screen.blit(text, (MENU_TITLE_POS_X, MENU_TITLE_POS_Y))
-            font = pygame.font.Font(GAME_FONT, MENU_PLAY_SIZE)
             if selected_option == 0:
-                text = font.render(MENU_PLAY_TITLE, True, MENU_SELECT_COLOR)
+                text = text_cache.render(MENU_PLAY_TITLE, MENU_PLAY_SIZE, MENU_SELECT_COLOR)
             else:
-                text = font.render(MENU_PLAY_TITLE, True, MENU_PLAY_COLOR)
-            self.fake_screen.blit(text, (MENU_PLAY_POS_X, MENU_PLAY_POS_Y))
-            font = pygame.font.Font(GAME_FONT, MENU_EXIT_SIZE)
+                text = text_cache.render(MENU_PLAY_TITLE, MENU_PLAY_SIZE, MENU_PLAY_COLOR)
+            play_rect = self.fake_screen.blit(text, (MENU_PLAY_POS_X, MENU_PLAY_POS_Y))
             if selected_option == 1:
-                text = font.render(MENU_EXIT_TITLE, True, MENU_SELECT_COLOR)
+                text = text_cache.render(MENU_EXIT_TITLE, MENU_EXIT_SIZE, MENU_SELECT_COLOR)
+            else:
+                text = text_cache.render(MENU_EXIT_TITLE, MENU_EXIT_SIZE, MENU_EXIT_COLOR)
+            exit_rect = self.fake_screen.blit(text, (MENU_EXIT_POS_X, MENU_EXIT_POS_Y))
+            # Menu Animation, only the options change when one is selected
+            if option_changed:
+                self.presenter.present([play_rect, exit_rect])
+                option_changed = False
             else:
-                text = font.render(MENU_EXIT_TITLE, True, MENU_EXIT_COLOR)
-            self.fake_screen.blit(text, (MENU_EXIT_POS_X, MENU_EXIT_POS_Y))
-            # Menu Animation
-            self.screen.blit(pygame.transform.scale(self.fake_screen, self.screen.get_rect().size), (0, 0))
-            pygame.display.flip()
+                self.presenter.present([])
             self.clock.tick(FPS)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -394,6 +606,7 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_DOWN or event.key == pygame.K_UP:
                         self.option_sound.play()
+                        option_changed = True
                         if selected_option == 0:
                             selected_option = 1
                         else:
@@ -414,13 +627,13 @@ class Game:
     def game_over_screen(self):
         now = pygame.time.get_ticks()
         self.last_game_over_screen_time = now
+        # The screen does not change after its first frame
+        self.presenter.invalidate()
         while now - self.last_game_over_screen_time < GAME_OVER_SCREEN_WAITING_TIME:
             self.fake_screen.fill(BLACK)
-            font = pygame.font.Font(GAME_FONT, GAME_OVER_TITLE_SIZE)
-            text = font.render(GAME_OVER_TITLE, True, GAME_OVER_COLOR)
+            text = text_cache.render(GAME_OVER_TITLE, GAME_OVER_TITLE_SIZE, GAME_OVER_COLOR)
             self.fake_screen.blit(text, (GAME_OVER_POS_X, GAME_OVER_POS_Y))
-            self.screen.blit(pygame.transform.scale(self.fake_screen, self.screen.get_rect().size), (0, 0))
-            pygame.display.flip()
+            self.presenter.present([])
             self.clock.tick(FPS)
             now = pygame.time.get_ticks()
             for event in pygame.event.get():
@@ -435,13 +648,13 @@ class Game:
     def game_completed_screen(self):
         now = pygame.time.get_ticks()
         self.last_game_completed_screen_time = now
+        # The screen does not change after its first frame
+        self.presenter.invalidate()
         while now - self.last_game_completed_screen_time < GAME_COMPLETED_SCREEN_WAITING_TIME:
             self.fake_screen.fill(BLACK)
-            font = pygame.font.Font(GAME_FONT, GAME_COMPLETED_TITLE_SIZE)
-            text = font.render(GAME_COMPLETED_TITLE, True, GAME_COMPLETED_COLOR)
+            text = text_cache.render(GAME_COMPLETED_TITLE, GAME_COMPLETED_TITLE_SIZE, GAME_COMPLETED_COLOR)
             self.fake_screen.blit(text, (GAME_COMPLETED_POS_X, GAME_COMPLETED_POS_Y))
-            self.screen.blit(pygame.transform.scale(self.fake_screen, self.screen.get_rect().size), (0, 0))
-            pygame.display.flip()
+            self.presenter.present([])
             self.clock.tick(FPS)
             now = pygame.time.get_ticks()
             for event in pygame.event.get():
@@ -456,13 +669,13 @@ class Game:
     def loading_screen(self):
         now = pygame.time.get_ticks()
         self.last_loading_screen_time = now
+        # The screen does not change after its first frame
+        self.presenter.invalidate()
         while now - self.last_loading_screen_time < LOADING_SCREEN_WAITING_TIME:
             self.fake_screen.fill(BLACK)
-            font = pygame.font.Font(GAME_FONT, LOADING_TITLE_SIZE)
-            text = font.render(LOADING_TITLE, True, LOADING_COLOR)
+            text = text_cache.render(LOADING_TITLE, LOADING_TITLE_SIZE, LOADING_COLOR)
             self.fake_screen.blit(text, (LOADING_POS_X, LOADING_POS_Y))
-            self.screen.blit(pygame.transform.scale(self.fake_screen, self.screen.get_rect().size), (0, 0))
-            pygame.display.flip()
+            self.presenter.present([])
             self.clock.tick(FPS)
             now = pygame.time.get_ticks()
             for event in pygame.event.get():
@@ -475,15 +688,18 @@ class Game:
         return
 
     def load_sounds(self):
-        self.menu_sound = mixer.Sound(MENU_SOUND)
-        self.option_sound = mixer.Sound(OPTION_SOUND)
-        self.select_sound = mixer.Sound(SELECT_SOUND)
-        self.jump_sound = mixer.Sound(JUMP_SOUND)
-        self.explosion_sound = mixer.Sound(EXPLOSION_SOUND)
-        self.pause_sound = mixer.Sound(PAUSE_SOUND)
-        self.fire_sound = mixer.Sound(FIRE_SOUND)
-        self.hit_sound = mixer.Sound(HIT_SOUND)
-        self.coin_sound = mixer.Sound(COIN_SOUND)
+        # The effects are played through the dispatcher, which limits their voices (see SoundDispatcher)
+        self.sounds = SoundDispatcher()
+        self.menu_sound = self.sounds.load(MENU_SOUND)
+        self.option_sound = self.sounds.load(OPTION_SOUND)
+        self.select_sound = self.sounds.load(SELECT_SOUND)
+        self.jump_sound = self.sounds.load(JUMP_SOUND)
+        self.explosion_sound = self.sounds.load(EXPLOSION_SOUND)
+        self.pause_sound = self.sounds.load(PAUSE_SOUND)
+        self.fire_sound = self.sounds.load(FIRE_SOUND)
+        self.hit_sound = self.sounds.load(HIT_SOUND)
+        self.coin_sound = self.sounds.load(COIN_SOUND)
+        self.music = MusicStream()
         return
 
 
@@ -494,6 +710,7 @@ def main(game):
         world = 1
         game.player_lives = INITIAL_PLAYER_LIVES
         game.player_coins = 0
+        game.music.rewind()
         if not game.exit:
             game.playing = True
             game.running = True
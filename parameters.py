@@ -1,13 +1,65 @@
 # GAME GENERAL OPTIONS
 TITLE = "Crazy Jumper"
 GAME_FONT = "assets/fonts/cameria.ttf"
+TEXT_CACHE_SIZE = 64    # Rendered texts kept in memory
 MENU_BACKGROUND = "assets/menu/menu.png"
 WIDTH = 960
 HEIGHT = 540
-FPS = 60
+FPS = 60    # Maximum frames drawn per second
+SIMULATION_RATE = 60    # Simulation steps per second, independent of the frame rate
+SIMULATION_STEP = 1000 / SIMULATION_RATE    # ms
+MAX_SIMULATION_STEPS_PER_FRAME = 5  # Above this the game slows down instead of falling behind
 CAMERA_SCROLL_GAP_X = 200
 CAMERA_SCROLL_GAP_Y = 80
 COLLISION_GAP = 4
+COLLISION_CELL_SIZE = 128   # Side of the cells of the collision grids
+COLLISION_BACKEND = "grid"  # "grid": spatial hash grids, "numpy": batched tests of arrays of rects (falls back to "grid" without numpy)
+SLEEP_MARGIN = 300  # Pixels around the screen where enemies and coins are awake, further they are neither updated nor drawn
+
+# DRAWING LAYERS, from the bottom one
+PLAYER_LAYER = 0
+COIN_LAYER = 1
+ENEMY_LAYER = 2
+EFFECT_LAYER = 3    # Projectiles, splashes and explosions, in the order they appear
+DRAWING_LAYERS = 4
+
+# PRESENTATION
+WINDOW_SCALING = "software"     # "software": the game scales its frames to the window, "display": SDL scales the window (SCALED mode)
+DIRTY_RECT_PRESENTATION = False     # Updates only the changed parts of the window while the camera is still
+DIRTY_RECT_MAX_AREA_RATIO = 0.5     # Above this part of the screen the whole window is updated
+DIRTY_RECT_MARGIN = 2
+
+# DEBUG OVERLAY (toggled with F3)
+SHOW_DEBUG_OVERLAY = False
+DEBUG_OVERLAY_FONT_SIZE = 20
+DEBUG_OVERLAY_COLOR = (255, 255, 0)
+DEBUG_OVERLAY_POS_X = 15
+DEBUG_OVERLAY_POS_Y = 410
+
+# ASSET ATLAS (built with: python build_atlas.py)
+USE_ATLAS = True
+ATLAS_IMAGE = "assets/atlas/atlas.rgba"
+ATLAS_INDEX = "assets/atlas/atlas.json"
+ATLAS_WIDTH = 1024
+
+# SURFACE FORMATS
+# Every loaded image is converted to the pixel format of the display:
+# "alpha" keeps per pixel transparency, "colorkey" uses a transparent colour with RLE acceleration, "opaque" has no transparency
+SPRITE_SURFACE_FORMAT = "alpha"
+WORLD_TILES_SURFACE_FORMAT = "colorkey"
+WORLD_TILES_COLORKEY = (255, 255, 255)
+WORLD_BACKGROUND_SURFACE_FORMAT = "opaque"
+WORLD_BACKGROUND_LAYER_SURFACE_FORMAT = "alpha"     # Background layers in front of the first one
+MENU_BACKGROUND_SURFACE_FORMAT = "opaque"
+
+# WORLD CHUNKS STREAMING (chunks are baked with: python build_atlas.py)
+WORLD_CHUNKS_DIRECTORY = "assets/chunks"
+WORLD_CHUNK_WIDTH = 480
+WORLD_CHUNK_LOAD_MARGIN = 480   # Chunks nearer than this to the screen are decoded
+WORLD_CHUNK_EVICT_MARGIN = 960  # Chunks farther than this from the screen are dropped
+
+# WORLD PREFETCHING
+WORLD_PREFETCH_MEMORY_BUDGET = 256 * 1024 * 1024    # Bytes of decoded worlds kept in memory
 
 # SOUND
 MENU_SOUND = "assets/sounds/menu.wav"
@@ -19,6 +71,20 @@ PAUSE_SOUND = "assets/sounds/pause.wav"
 FIRE_SOUND = "assets/sounds/fire.wav"
 HIT_SOUND = "assets/sounds/hit.wav"
 COIN_SOUND = "assets/sounds/coin.wav"
+SOUND_CHANNELS = 16     # Mixer channels of the sound effects
+SOUND_COALESCE_WINDOW = 50  # ms, the triggers of an effect closer than this are played once
+# Maximum voices of each effect and its priority, an effect steals the channel of a lower priority one when every channel is busy
+SOUND_EFFECT_VOICES = {
+    MENU_SOUND: (1, 5),
+    OPTION_SOUND: (1, 4),
+    SELECT_SOUND: (1, 4),
+    PAUSE_SOUND: (1, 4),
+    JUMP_SOUND: (1, 3),
+    COIN_SOUND: (3, 3),
+    EXPLOSION_SOUND: (3, 2),
+    HIT_SOUND: (2, 2),
+    FIRE_SOUND: (4, 1),
+}
 
 # COLORS
 WHITE = (255, 255, 255)
@@ -95,6 +161,11 @@ ENEMY_FIREBALL_RIGHT_OFFSET_X = 0
 ENEMY_FIREBALL_LEFT_OFFSET_X = -50
 ENEMY_FIREBALL_OFFSET_Y = -15
 ENEMY_FIREBALL_VELOCITY_X = 0.8
+ENEMY_FIRE_ANGLE_BUCKETS = 64   # Number of pre-rotated sprites for a full circle
+ENEMY_FIRE_PRELOAD_ROTATIONS = True     # Rotates the sprites when the world is loaded instead of the first shot
+ENEMY_FIRE_POOL_SIZE = 256  # Enemy fireballs alive at the same time, more are not fired
+ENEMY_FIRE_MAX_AGE = 5000   # ms before an enemy fireball despawns, None to keep it until it leaves the world
+ENEMY_FIRE_OFFSCREEN_MARGIN = 400   # Pixels out of the screen where an enemy fireball despawns, None to keep it
 
 # PLAYER FIREBALL ANIMATION
 FIREBALL_FRAMES_NUMBER = 4
@@ -107,6 +178,9 @@ FIREBALL_OFFSET_Y = 30
 FIREBALL_VELOCITY_X = 0.8
 FIREBALL_Y_MOTION_INITIAL_VELOCITY = 0
 FIREBALL_Y_GRAVITY_FACTOR = 0
+FIREBALL_POOL_SIZE = 64     # Fireballs alive at the same time, more are not fired
+FIREBALL_MAX_AGE = 2500     # ms before a fireball despawns, None to keep it until it leaves the world
+FIREBALL_OFFSCREEN_MARGIN = 200     # Pixels out of the screen where a fireball despawns, None to keep it
 FIREBALL_SPAWN_TIME_INTERVAL = 200
 
 # COIN ANIMATION
@@ -132,6 +206,7 @@ EXPLOSION_FRAMES_NUMBER = 16
 EXPLOSION_ANIMATION_FRAME_TIME = 30
 
 # MISCBAR PARAMETERS
+MISCBAR_LAYER_HEIGHT = 70
 MISCBAR_PLAYER_HEAD_WIDTH = 45
 MISCBAR_PLAYER_HEAD_HEIGHT = 45
 MISCBAR_COIN_FRAMES_NUMBER = 10
@@ -201,6 +276,7 @@ WORLD_HEIGHT_DIRECTORY = []
 WORLD_INITIAL_X_DIRECTORY = []
 WORLD_INITIAL_Y_DIRECTORY = []
 WORLD_DEPTH_FACTOR_DIRECTORY = []
+WORLD_BACKGROUND_LAYERS_DIRECTORY = []
 WORLD_BACKGROUND_WIDTH_DIRECTORY = []
 WORLD_BACKGROUND_HEIGHT_DIRECTORY = []
 WORLD_PLAYER_INITIAL_X_DIRECTORY = []
@@ -219,6 +295,7 @@ for world in range(NUMBER_OF_WORLDS):
     WORLD_INITIAL_X_DIRECTORY.append(0)
     WORLD_INITIAL_Y_DIRECTORY.append(0)
     WORLD_DEPTH_FACTOR_DIRECTORY.append(0)
+    WORLD_BACKGROUND_LAYERS_DIRECTORY.append(0)
     WORLD_BACKGROUND_WIDTH_DIRECTORY.append(0)
     WORLD_BACKGROUND_HEIGHT_DIRECTORY.append(0)
     WORLD_PLAYER_INITIAL_X_DIRECTORY.append(0)
@@ -240,6 +317,11 @@ WORLD_DEPTH_FACTOR_DIRECTORY[WORLD - 1] = 0.3
 WORLD_PLAYER_INITIAL_X_DIRECTORY[WORLD-1] = WIDTH * 0.25
 WORLD_PLAYER_INITIAL_Y_DIRECTORY[WORLD-1] = HEIGHT * 0.5
 
+# Background layers (image, depth factor, y), from the farthest to the nearest
+WORLD_BACKGROUND_LAYERS_DIRECTORY[WORLD-1] = [
+    (WORLD_BACKGROUND_DIRECTORY[WORLD-1], WORLD_DEPTH_FACTOR_DIRECTORY[WORLD-1], -300),
+]
+
 # Door (WORLD, x, y, width, height)
 WORLD_DOOR_DIRECTORY[WORLD-1] = (WORLD, 4690, 330, 45, 65)
 
@@ -328,6 +410,11 @@ WORLD_DEPTH_FACTOR_DIRECTORY[WORLD - 1] = 0.3
 WORLD_PLAYER_INITIAL_X_DIRECTORY[WORLD-1] = WIDTH * 0.25
 WORLD_PLAYER_INITIAL_Y_DIRECTORY[WORLD-1] = HEIGHT * 0.5
 
+# Background layers (image, depth factor, y), from the farthest to the nearest
+WORLD_BACKGROUND_LAYERS_DIRECTORY[WORLD-1] = [
+    (WORLD_BACKGROUND_DIRECTORY[WORLD-1], WORLD_DEPTH_FACTOR_DIRECTORY[WORLD-1], -300),
+]
+
 # Door (WORLD, x, y, width, height)
 WORLD_DOOR_DIRECTORY[WORLD-1] = (WORLD, 4700, 510, 65, 70)
 
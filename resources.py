@@ -0,0 +1,459 @@
+# Resources loading and caching
+import json
+import mmap
+import os
+import threading
+import wave
+from collections import OrderedDict
+import pygame
+from pygame import mixer
+from parameters import *
+
+
+def prepare_surface(surface, surface_format, colorkey=None):
+    # Converts a loaded surface to the pixel format of the display, so that it is blitted without any conversion
+    if pygame.display.get_surface() is None:
+        # There is no display format to convert to (e.g. when building the atlas)
+        return surface
+    if surface_format == "alpha":
+        return surface.convert_alpha()
+    surface = surface.convert()
+    if surface_format == "colorkey":
+        surface.set_colorkey(colorkey, pygame.RLEACCEL)
+    return surface
+
+
+def blit_visible(screen, image, rect):
+    # Blits only the part of a large image that is inside the screen
+    area = screen.get_rect().move(-rect.x, -rect.y).clip(image.get_rect())
+    if area.width and area.height:
+        screen.blit(image, (rect.x + area.x, rect.y + area.y), area)
+    return
+
+
+class Atlas:
+    # All the sprite frames baked by build_atlas.py in a single raw RGBA file.
+    # The file is memory mapped and every frame is a subsurface of it, so loading needs no image decoding.
+    def __init__(self, image_path, index_path):
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+        with open(image_path, "rb") as image_file:
+            self.buffer = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.image = pygame.image.frombuffer(self.buffer, (index["width"], index["height"]), "RGBA")
+        self.image = prepare_surface(self.image, SPRITE_SURFACE_FORMAT)
+        self.frames = {}
+        for entry in index["frames"]:
+            key = (entry["path"], tuple(entry["size"]), entry["flip"])
+            self.frames[key] = self.image.subsurface(entry["rect"])
+        return
+
+
+class FrameCache:
+    # Every frame set is loaded from the disk and scaled only once and then shared by all the objects that use it.
+    # The returned tuples and surfaces are shared, so they must never be modified by the objects.
+    def __init__(self):
+        self.atlas = None
+        self.clear()
+        return
+
+    def clear(self):
+        self.frame_sets = {}
+        self.files = {}
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def load_atlas(self, image_path, index_path):
+        # The atlas is optional, frames that are not baked in it are loaded from their own files
+        if os.path.exists(image_path) and os.path.exists(index_path):
+            self.atlas = Atlas(image_path, index_path)
+        return
+
+    def load_frames(self, directory, frames_number, size, flip=False):
+        # Frames are the files 0.png, 1.png, ... of the directory
+        key = (directory, frames_number, size, flip)
+        if key in self.frame_sets:
+            self.hits += 1
+            return self.frame_sets[key]
+        self.misses += 1
+        frames = tuple(self.load_file(f"{directory}/{frame}.png", size, flip) for frame in range(frames_number))
+        self.frame_sets[key] = frames
+        return frames
+
+    def load_image(self, path, size, flip=False):
+        key = (path, None, size, flip)
+        if key in self.frame_sets:
+            self.hits += 1
+            return self.frame_sets[key][0]
+        self.misses += 1
+        image = self.load_file(path, size, flip)
+        self.frame_sets[key] = (image,)
+        return image
+
+    def load_frames_with_image(self, directory, frames_number, size, path, flip=False):
+        # Frames of the directory followed by the image of path, as one frame set shared like the others
+        key = (directory, frames_number, size, flip, path)
+        if key in self.frame_sets:
+            self.hits += 1
+            return self.frame_sets[key]
+        self.misses += 1
+        frames = self.load_frames(directory, frames_number, size, flip) + (self.load_file(path, size, flip),)
+        self.frame_sets[key] = frames
+        return frames
+
+    def load_file(self, path, size, flip=False):
+        key = (path, size, flip)
+        if key in self.files:
+            return self.files[key]
+        if self.atlas is not None and key in self.atlas.frames:
+            frame = self.atlas.frames[key]
+        elif flip:
+            # Flipped frames are made from the original frames, so no extra file is read
+            frame = pygame.transform.flip(self.load_file(path, size), True, False)
+        else:
+            frame = prepare_surface(pygame.transform.scale(pygame.image.load(path), size), SPRITE_SURFACE_FORMAT)
+        self.files[key] = frame
+        return frame
+
+    def load_rotated_frames(self, directory, frames_number, size, flip, bucket, buckets_number):
+        # Frames rotated by bucket / buckets_number of a full circle
+        key = (directory, frames_number, size, flip, bucket, buckets_number)
+        if key in self.frame_sets:
+            self.hits += 1
+            return self.frame_sets[key]
+        self.misses += 1
+        angle = 360 * bucket / buckets_number
+        frames = tuple(pygame.transform.rotate(frame, angle) for frame in self.load_frames(directory, frames_number, size, flip))
+        self.frame_sets[key] = frames
+        return frames
+
+    def memory_usage(self):
+        # Bytes used by the pixels of all the cached frames, the frames shared by many sets are counted once
+        frames = {}
+        for frame_set in self.frame_sets.values():
+            for frame in frame_set:
+                frames[id(frame)] = frame
+        usage = 0
+        for frame in frames.values():
+            usage += frame.get_width() * frame.get_height() * frame.get_bytesize()
+        return usage
+
+    def report(self):
+        return f"FRAMES {len(self.frame_sets)} SETS  {self.hits} HITS  {self.misses} MISSES  {self.memory_usage() // 1024} KB"
+
+
+def bake_world_chunks(world_number):
+    # Writes the tiles of a world, scaled to the world size, in chunks of WORLD_CHUNK_WIDTH pixels with their index
+    width = WORLD_WIDTH_DIRECTORY[world_number-1]
+    height = WORLD_HEIGHT_DIRECTORY[world_number-1]
+    directory = f"{WORLD_CHUNKS_DIRECTORY}/world_{world_number}"
+    os.makedirs(directory, exist_ok=True)
+    image = pygame.image.load(WORLD_TILES_DIRECTORY[world_number-1])
+    image = pygame.transform.scale(image, (width, height))
+    chunks_number = -(-width // WORLD_CHUNK_WIDTH)
+    for index in range(chunks_number):
+        x = index * WORLD_CHUNK_WIDTH
+        pygame.image.save(image.subsurface((x, 0, min(WORLD_CHUNK_WIDTH, width - x), height)), f"{directory}/{index}.png")
+    # The index is written last, so chunks that are only partly written are not used
+    with open(f"{directory}/index.json", "w") as index_file:
+        json.dump({"width": width, "height": height, "chunk_width": WORLD_CHUNK_WIDTH}, index_file)
+    return chunks_number
+
+
+class WorldChunks:
+    # The tiles of a world split in columns of WORLD_CHUNK_WIDTH pixels. Chunks are decoded on a worker thread
+    # when the screen gets near them and dropped when it is far from them, so the memory does not grow with the world width
+    def __init__(self, world_number):
+        self.world_number = world_number
+        self.width = WORLD_WIDTH_DIRECTORY[world_number-1]
+        self.height = WORLD_HEIGHT_DIRECTORY[world_number-1]
+        self.chunks_number = -(-self.width // WORLD_CHUNK_WIDTH)
+        self.directory = f"{WORLD_CHUNKS_DIRECTORY}/world_{world_number}"
+        self.chunks = {}
+        self.loading = {}
+        self.failed = set()     # Chunks whose file could not be decoded, they are not loaded again
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        self.baked = self.check_baked_chunks()
+        if not self.baked:
+            # The chunks are baked on the first run (or by build_atlas.py)
+            try:
+                bake_world_chunks(world_number)
+                self.baked = self.check_baked_chunks()
+            except (OSError, pygame.error):
+                self.baked = False
+        if not self.baked:
+            # Without baked chunks the whole image is decoded and all its chunks stay in memory
+            image = pygame.image.load(WORLD_TILES_DIRECTORY[world_number-1])
+            image = pygame.transform.scale(image, (self.width, self.height))
+            for index in range(self.chunks_number):
+                chunk = image.subsurface(self.chunk_rect(index)).copy()
+                self.chunks[index] = prepare_surface(chunk, WORLD_TILES_SURFACE_FORMAT, WORLD_TILES_COLORKEY)
+        return
+
+    def check_baked_chunks(self):
+        # Chunks baked with other sizes than the current parameters are not used
+        index_path = f"{self.directory}/index.json"
+        if not os.path.exists(index_path):
+            return False
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+        return index == {"width": self.width, "height": self.height, "chunk_width": WORLD_CHUNK_WIDTH}
+
+    def chunk_rect(self, index):
+        x = index * WORLD_CHUNK_WIDTH
+        return pygame.Rect(x, 0, min(WORLD_CHUNK_WIDTH, self.width - x), self.height)
+
+    def load_chunk(self, index):
+        try:
+            chunk = pygame.image.load(f"{self.directory}/{index}.png")
+            chunk = prepare_surface(chunk, WORLD_TILES_SURFACE_FORMAT, WORLD_TILES_COLORKEY)
+            with self.lock:
+                self.chunks[index] = chunk
+                self.loads += 1
+        except (OSError, pygame.error):
+            with self.lock:
+                self.failed.add(index)
+        finally:
+            with self.lock:
+                del self.loading[index]
+        return
+
+    def stream(self, left, right):
+        # Makes sure that the chunks between the world x coordinates left and right are decoded,
+        # starts decoding the ones near them and drops the far ones
+        if not self.baked:
+            return
+        first = max(0, left // WORLD_CHUNK_WIDTH)
+        last = min(self.chunks_number - 1, right // WORLD_CHUNK_WIDTH)
+        first_near = max(0, (left - WORLD_CHUNK_LOAD_MARGIN) // WORLD_CHUNK_WIDTH)
+        last_near = min(self.chunks_number - 1, (right + WORLD_CHUNK_LOAD_MARGIN) // WORLD_CHUNK_WIDTH)
+        for index in range(first_near, last_near + 1):
+            with self.lock:
+                if index in self.chunks or index in self.loading or index in self.failed:
+                    continue
+                thread = threading.Thread(target=self.load_chunk, args=(index,), daemon=True)
+                self.loading[index] = thread
+            thread.start()
+        # The visible chunks have to be ready before they are drawn
+        for index in range(first, last + 1):
+            with self.lock:
+                thread = self.loading.get(index)
+            if thread is not None:
+                thread.join()
+        with self.lock:
+            for index in list(self.chunks):
+                chunk_rect = self.chunk_rect(index)
+                if chunk_rect.right < left - WORLD_CHUNK_EVICT_MARGIN or chunk_rect.left > right + WORLD_CHUNK_EVICT_MARGIN:
+                    del self.chunks[index]
+                    self.evictions += 1
+        return
+
+    def draw(self, screen, rect):
+        # rect is the position of the whole world on the screen
+        for index, chunk in list(self.chunks.items()):
+            blit_visible(screen, chunk, self.chunk_rect(index).move(rect.x, rect.y))
+        return
+
+    def memory_usage(self):
+        usage = 0
+        for chunk in list(self.chunks.values()):
+            usage += chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+        return usage
+
+    def report(self):
+        return f"CHUNKS {len(self.chunks)}/{self.chunks_number}  LOADS {self.loads}  EVICTIONS {self.evictions}  FAILED {len(self.failed)}"
+
+
+class WorldResources:
+    # Decoded tiles and background of a world, its music is streamed (see MusicStream)
+    def __init__(self, world_number):
+        self.world_number = world_number
+        # Chunks visible at the start of the world are decoded now
+        self.tiles = WorldChunks(world_number)
+        self.tiles.stream(-WORLD_INITIAL_X_DIRECTORY[world_number-1], WIDTH - WORLD_INITIAL_X_DIRECTORY[world_number-1])
+        # Background layers keep their native size, the nearer layers need transparency
+        self.backgrounds = []
+        for image_source, depth_factor, y in WORLD_BACKGROUND_LAYERS_DIRECTORY[world_number-1]:
+            if self.backgrounds:
+                surface_format = WORLD_BACKGROUND_LAYER_SURFACE_FORMAT
+            else:
+                surface_format = WORLD_BACKGROUND_SURFACE_FORMAT
+            self.backgrounds.append(prepare_surface(pygame.image.load(image_source), surface_format))
+        return
+
+    def memory_usage(self):
+        usage = self.tiles.memory_usage()
+        for background in self.backgrounds:
+            usage += background.get_width() * background.get_height() * background.get_bytesize()
+        return usage
+
+
+class WorldPrefetcher:
+    # Decodes the worlds on a worker thread before they are needed and keeps the most recently used ones,
+    # as long as they fit in the memory budget
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        self.worlds = OrderedDict()
+        self.loading = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def prefetch(self, world_number):
+        with self.lock:
+            if world_number in self.worlds or world_number in self.loading:
+                return
+            thread = threading.Thread(target=self.load, args=(world_number,), daemon=True)
+            self.loading[world_number] = thread
+        thread.start()
+        return
+
+    def load(self, world_number):
+        try:
+            resources = WorldResources(world_number)
+            with self.lock:
+                self.store(resources)
+        finally:
+            with self.lock:
+                del self.loading[world_number]
+        return
+
+    def is_ready(self, world_number):
+        with self.lock:
+            return world_number in self.worlds
+
+    def get(self, world_number):
+        # Waits for a world that is being prefetched, or decodes it now if it has not been prefetched
+        with self.lock:
+            thread = self.loading.get(world_number)
+        if thread is not None:
+            thread.join()
+        with self.lock:
+            if world_number in self.worlds:
+                self.hits += 1
+                self.worlds.move_to_end(world_number)
+                return self.worlds[world_number]
+        self.misses += 1
+        resources = WorldResources(world_number)
+        with self.lock:
+            self.store(resources)
+        return resources
+
+    def store(self, resources):
+        self.worlds[resources.world_number] = resources
+        self.worlds.move_to_end(resources.world_number)
+        # The least recently used worlds are dropped first, the newest world is always kept
+        while len(self.worlds) > 1 and self.memory_usage() > self.memory_budget:
+            self.worlds.popitem(last=False)
+        return
+
+    def memory_usage(self):
+        usage = 0
+        for resources in self.worlds.values():
+            usage += resources.memory_usage()
+        return usage
+
+
+def track_length(track):
+    # Seconds of a WAV track read from its header, None for the other formats
+    try:
+        with wave.open(track) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        return None
+
+
+class MusicStream:
+    # Music streamed from its file by mixer.music, only a small decode buffer is in memory whatever the track length.
+    # The position reached in every track is kept, so a world that is played again (after a respawn)
+    # goes on with its music where it was stopped.
+    def __init__(self):
+        self.track = None
+        self.start = 0      # Seconds of the track where it was started
+        self.positions = {}
+        self.lengths = {}
+        return
+
+    def play(self, track):
+        self.stop()
+        if track not in self.lengths:
+            self.lengths[track] = track_length(track)
+        self.track = track
+        self.start = self.positions.get(track, 0)
+        mixer.music.load(track)
+        mixer.music.play(-1, self.start)
+        return
+
+    def position(self):
+        # Seconds of the track played, get_pos does not count the pauses
+        played = self.start + max(mixer.music.get_pos(), 0) / 1000
+        length = self.lengths.get(self.track)
+        if length:
+            played %= length
+        return played
+
+    def pause(self):
+        mixer.music.pause()
+        return
+
+    def resume(self):
+        mixer.music.unpause()
+        return
+
+    def stop(self):
+        if self.track is not None:
+            self.positions[self.track] = self.position()
+            mixer.music.stop()
+            mixer.music.unload()
+            self.track = None
+        return
+
+    def rewind(self):
+        # Every track starts again from its beginning
+        self.positions.clear()
+        return
+
+
+class FontRegistry:
+    # Every font file is opened only once for each size
+    def __init__(self):
+        self.fonts = {}
+        return
+
+    def get(self, size, font_path=GAME_FONT):
+        key = (font_path, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(font_path, size)
+        return self.fonts[key]
+
+
+class TextCache:
+    # Rendered texts are kept in a LRU cache, so a text is rasterized again only when it changes
+    def __init__(self, fonts, max_texts):
+        self.fonts = fonts
+        self.max_texts = max_texts
+        self.texts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def render(self, text, size, color, font_path=GAME_FONT):
+        key = (text, size, color, font_path)
+        if key in self.texts:
+            self.hits += 1
+            self.texts.move_to_end(key)
+            return self.texts[key]
+        self.misses += 1
+        surface = prepare_surface(self.fonts.get(size, font_path).render(text, True, color), SPRITE_SURFACE_FORMAT)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_texts:
+            self.texts.popitem(last=False)
+        return surface
+
+
+frame_cache = FrameCache()
+fonts = FontRegistry()
+text_cache = TextCache(fonts, TEXT_CACHE_SIZE)
@@ -0,0 +1,84 @@
+# Sound effects played through a fixed number of mixer channels
+import pygame
+from pygame import mixer
+from parameters import *
+
+
+class SoundEffect:
+    # A loaded effect, played through the dispatcher so that its voices are limited
+    def __init__(self, dispatcher, path, voices, priority):
+        self.dispatcher = dispatcher
+        self.sound = mixer.Sound(path)
+        self.voices = voices        # Channels playing the effect at the same time
+        self.priority = priority
+        self.last_play = None       # ms of real time, the effects are also played in the menus and the pause
+        self.played = 0
+        self.dropped = 0
+        return
+
+    def play(self, loops=0):
+        return self.dispatcher.play(self, loops)
+
+    def stop(self):
+        self.sound.stop()
+        return
+
+
+class SoundDispatcher:
+    # Triggers of an effect closer than the coalescing window are played once, an effect plays on at most its number of voices,
+    # and when every channel is busy the effect steals the channel of the lowest priority effect below its own.
+    # The other triggers are dropped and counted.
+    def __init__(self, channels=SOUND_CHANNELS, window=SOUND_COALESCE_WINDOW):
+        mixer.set_num_channels(channels)
+        self.channels = [mixer.Channel(i) for i in range(channels)]
+        self.owners = [None] * channels     # Effect last played on each channel
+        self.window = window
+        self.played = 0
+        self.dropped = 0
+        self.stolen = 0
+        return
+
+    def load(self, path):
+        voices, priority = SOUND_EFFECT_VOICES[path]
+        return SoundEffect(self, path, voices, priority)
+
+    def play(self, effect, loops=0):
+        # The channel playing the effect, None when the trigger is dropped
+        now = pygame.time.get_ticks()
+        if effect.last_play is not None and now - effect.last_play < self.window:
+            return self.drop(effect)
+        free = None
+        voices = 0
+        lowest = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free is None:
+                    free = index
+            elif self.owners[index] is effect:
+                voices += 1
+            elif self.owners[index] is not None:
+                if lowest is None or self.owners[index].priority < self.owners[lowest].priority:
+                    lowest = index
+        if voices >= effect.voices:
+            return self.drop(effect)
+        if free is None:
+            if lowest is None or self.owners[lowest].priority >= effect.priority:
+                return self.drop(effect)
+            free = lowest
+            self.channels[free].stop()
+            self.stolen += 1
+        channel = self.channels[free]
+        channel.play(effect.sound, loops)
+        self.owners[free] = effect
+        effect.last_play = now
+        effect.played += 1
+        self.played += 1
+        return channel
+
+    def drop(self, effect):
+        effect.dropped += 1
+        self.dropped += 1
+        return None
+
+    def report(self):
+        return f"SOUNDS {self.played} PLAYED  {self.dropped} DROPPED  {self.stolen} STOLEN"
@@ -0,0 +1,159 @@
+# Tests of the collision detection, run with: python -m pytest
+import random
+import pygame
+import pytest
+from parameters import *
+from collisions import SpatialHash, CollisionGroup, swept_collision, swept_hit, numpy
+
+LOW_RATE = 5    # Simulation steps per second where the projectiles move further in a step than the widths of the pairs
+BACKENDS = ["grid", pytest.param("numpy", marks=pytest.mark.skipif(numpy is None, reason="numpy is not installed"))]
+
+
+class Box:
+    # Stand-in for the assets, the collision detection only reads their rect
+    def __init__(self, x, y, w, h):
+        self.rect = pygame.Rect(x, y, w, h)
+        return
+
+
+class Mover(Box):
+    # Stand-in for the moving assets, with the rect of the start of the step
+    def __init__(self, x, y, w, h):
+        super().__init__(x, y, w, h)
+        self.last_rect = self.rect.copy()
+        return
+
+    def move(self, dx, dy):
+        self.last_rect = self.rect.copy()
+        self.rect.move_ip(dx, dy)
+        return
+
+
+def random_boxes(number, world_width=4000, world_height=1080):
+    # Boxes of many sizes, some of them crossing cell borders and negative coordinates
+    return [Box(random.randrange(-200, world_width), random.randrange(-200, world_height),
+                random.randint(1, 300), random.randint(1, 300)) for i in range(number)]
+
+
+def every_pair(objects, others):
+    return [(obj, other) for obj in objects for other in others if obj.rect.colliderect(other.rect)]
+
+
+def id_pair(pair):
+    return id(pair[0]), id(pair[1])
+
+
+def test_spatial_hash_query_finds_every_colliding_object_once():
+    random.seed(0)
+    boxes = random_boxes(500)
+    grid = SpatialHash(64)
+    for box in boxes:
+        grid.insert(box)
+    for query in random_boxes(200):
+        found = grid.query(query.rect)
+        assert len(found) == len(set(found))
+        assert set(found) == {box for box in boxes if query.rect.colliderect(box.rect)}
+
+
+def test_spatial_hash_remove():
+    random.seed(1)
+    boxes = random_boxes(200)
+    grid = SpatialHash(64)
+    for box in boxes:
+        grid.insert(box)
+    for box in boxes[::2]:
+        grid.remove(box)
+    kept = boxes[1::2]
+    for query in random_boxes(100):
+        assert set(grid.query(query.rect)) == {box for box in kept if query.rect.colliderect(box.rect)}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_collision_group_hits_match_every_pair(backend):
+    random.seed(2)
+    boxes = random_boxes(300)
+    others = random_boxes(300)
+    group = CollisionGroup(boxes, backend)
+    other_group = CollisionGroup(others, backend)
+    assert sorted(map(id_pair, group.hits(other_group))) == sorted(map(id_pair, every_pair(boxes, others)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_collision_group_query_after_moves(backend):
+    random.seed(3)
+    boxes = random_boxes(300)
+    group = CollisionGroup(boxes, backend)
+    for box in boxes:
+        box.rect.move_ip(random.randint(-50, 50), random.randint(-50, 50))
+    group.update()
+    for query in random_boxes(100):
+        assert set(group.query(query.rect)) == {box for box in boxes if query.rect.colliderect(box.rect)}
+
+
+def test_swept_collision_head_on():
+    rect = pygame.Rect(0, 0, 10, 10)
+    assert swept_collision(rect, 20, 0, pygame.Rect(15, 0, 10, 10)) == (0.25, -1, 0)
+    assert swept_collision(rect, -20, 0, pygame.Rect(-15, 0, 10, 10)) == (0.25, 1, 0)
+    assert swept_collision(rect, 0, 20, pygame.Rect(0, 15, 10, 10)) == (0.25, 0, -1)
+    assert swept_collision(rect, 0, -20, pygame.Rect(0, -15, 10, 10)) == (0.25, 0, 1)
+
+
+def test_swept_collision_through_a_thin_platform():
+    # A long step takes the rect from above to below the platform, the discrete test at the end of the step misses it
+    rect = pygame.Rect(40, 0, 10, 10)
+    platform = pygame.Rect(0, 50, 100, 2)
+    assert not rect.move(0, 200).colliderect(platform)
+    assert swept_collision(rect, 0, 200, platform) == (0.2, 0, -1)
+    assert swept_collision(rect, 30, 200, platform) == (0.2, 0, -1)
+
+
+def test_swept_collision_corner_gives_the_y_normal():
+    rect = pygame.Rect(0, 0, 10, 10)
+    assert swept_collision(rect, 20, 20, pygame.Rect(15, 15, 10, 10)) == (0.25, 0, -1)
+
+
+def test_swept_collision_misses():
+    rect = pygame.Rect(0, 0, 10, 10)
+    obstacle = pygame.Rect(15, 0, 10, 10)
+    assert swept_collision(rect, 4, 0, obstacle) is None            # Stops short
+    assert swept_collision(rect, -20, 0, obstacle) is None          # Moves away
+    assert swept_collision(rect, 20, 0, pygame.Rect(15, 10, 10, 10)) is None   # Slides along the edge
+    assert swept_collision(rect, 0, 20, obstacle) is None           # Parallel
+    assert swept_collision(rect, 20, 0, pygame.Rect(5, 5, 10, 10)) is None     # Overlaps at the start
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_collision_group_sweep_returns_the_first_hit(backend):
+    near = Box(0, 50, 100, 2)
+    far = Box(0, 100, 100, 2)
+    group = CollisionGroup([far, near], backend)
+    assert group.sweep(pygame.Rect(40, 0, 10, 10), 0, 200) == (0.2, 0, -1, near)
+    assert group.sweep(pygame.Rect(40, 0, 10, 10), 0, 0) is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fireball_through_an_enemy_at_a_low_rate(backend):
+    step = 1000 / LOW_RATE
+    enemy = Box(200, 0, ENEMY_WIDTH, ENEMY_HEIGHT)
+    fireball = Mover(150, 30, FIREBALL_WIDTH, FIREBALL_HEIGHT)
+    fireball.move(round(FIREBALL_VELOCITY_X * step), 0)
+    enemies = CollisionGroup([enemy], backend)
+    assert enemies.query(fireball.rect) == []
+    start = fireball.last_rect
+    assert enemies.sweep(start, fireball.rect.x - start.x, 0) == (0.0625, -1, 0, enemy)
+
+
+def test_enemy_fire_through_the_player_at_a_low_rate():
+    # The player runs into the fire, the two moves add up
+    step = 1000 / LOW_RATE
+    player = Mover(100, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+    fire = Mover(150, 30, ENEMY_FIRE_WIDTH, ENEMY_FIREBALL_HEIGHT)
+    player.move(round(UMAX * step / 1000), 0)
+    fire.move(-round(ENEMY_FIREBALL_VELOCITY_X * step), 0)
+    assert not player.rect.colliderect(fire.rect)
+    hit = swept_hit(fire, player)
+    assert hit is not None and hit[1:] == (1, 0)
+    # Passing above the player
+    fire = Mover(150, -30, ENEMY_FIRE_WIDTH, ENEMY_FIREBALL_HEIGHT)
+    fire.move(-round(ENEMY_FIREBALL_VELOCITY_X * step), 0)
+    assert swept_hit(fire, player) is None